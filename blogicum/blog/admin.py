@@ -1,45 +1,185 @@
 from django.contrib import admin
-from django.utils.safestring import mark_safe
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils.html import format_html
 
+from .cache import FACET_KEY
+from .constants import ADMIN_FACET_SIZE, ADMIN_FACET_TIMEOUT
 from .models import Category, Location, Post, Comment
+from .moderation import (delete_by_authors, delete_rows, hide_by_authors,
+                         set_published)
+from .paginators import EstimatedCountPaginator
+from .search import COMMENT_INDEX, match_expression, matching_ids
+
+User = get_user_model()
+
+
+@admin.action(description='Опубликовать', permissions=('change',))
+def publish(modeladmin, request, queryset):
+    changed = set_published(queryset, True)
+    modeladmin.message_user(request, f'Опубликовано: {changed}.')
+
+
+@admin.action(description='Снять с публикации', permissions=('change',))
+def unpublish(modeladmin, request, queryset):
+    changed = set_published(queryset, False)
+    modeladmin.message_user(request, f'Снято с публикации: {changed}.')
+
+
+@admin.action(description='Удалить', permissions=('delete',))
+def delete_in_batches(modeladmin, request, queryset):
+    deleted = delete_rows(queryset)
+    modeladmin.message_user(request, f'Удалено: {deleted}.')
+
+
+@admin.action(description='Снять с публикации все посты этих авторов',
+              permissions=('change',))
+def unpublish_by_authors(modeladmin, request, queryset):
+    changed = hide_by_authors(queryset)
+    modeladmin.message_user(request, f'Снято с публикации: {changed}.')
+
+
+@admin.action(description='Удалить все посты и комментарии этих авторов',
+              permissions=('delete',))
+def delete_everything_by_authors(modeladmin, request, queryset):
+    posts, comments = delete_by_authors(queryset)
+    modeladmin.message_user(
+        request, f'Удалено публикаций: {posts}, комментариев: {comments}.'
+    )
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = (delete_in_batches,)
+
+    def get_actions(self, request):
+        # The stock action loads and logs every row one by one.
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def delete_model(self, request, obj):
+        # Rows cascading from ``obj`` are handled in bulk, not one by one.
+        delete_rows(type(obj).objects.filter(pk=obj.pk))
+
+
+class TopAuthorFilter(admin.SimpleListFilter):
+    """Most active commenters, counted over the author index."""
+
+    title = 'автор'
+    parameter_name = 'author'
+
+    def lookups(self, request, model_admin):
+        # Grouping the whole comments table is too slow for every page
+        # load, and a few minutes old ranking is good enough.
+        return cache.get_or_set(FACET_KEY.format('authors'),
+                                self.top_authors, ADMIN_FACET_TIMEOUT)
+
+    def top_authors(self):
+        top = dict(
+            Comment.objects.order_by().values_list('author').annotate(
+                total=Count('pk')
+            ).order_by('-total')[:ADMIN_FACET_SIZE]
+        )
+        names = dict(User.objects.filter(pk__in=top).values_list(
+            'pk', 'username'
+        ))
+        return [(pk, f'{names[pk]} ({total})')
+                for pk, total in top.items() if pk in names]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(author_id=self.value())
+        return queryset
+
+
+class TopPostFilter(admin.SimpleListFilter):
+    """Most discussed posts, taken from ``Post.comment_count``."""
+
+    title = 'публикация'
+    parameter_name = 'post'
+
+    def lookups(self, request, model_admin):
+        return cache.get_or_set(FACET_KEY.format('posts'), self.top_posts,
+                                ADMIN_FACET_TIMEOUT)
+
+    def top_posts(self):
+        return [
+            (pk, f'{title[:30]} ({total})')
+            for pk, title, total in Post.objects.filter(
+                comment_count__gt=0
+            ).order_by('-comment_count').values_list(
+                'pk', 'title', 'comment_count'
+            )[:ADMIN_FACET_SIZE]
+        ]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(post_id=self.value())
+        return queryset
 
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(LargeTableAdmin):
     list_display = ('title', 'description', 'slug',
                     'is_published', 'created_at',)
     list_editable = ('is_published',)
     list_display_links = ('title', 'slug',)
-    search_fields = ('title', 'description',)
-    list_filter = ('title',)
+    actions = (publish, unpublish, delete_in_batches)
+    search_fields = ('title', 'slug',)
+    list_filter = ('is_published',)
 
 
 @admin.register(Location)
-class LocationAdmin(admin.ModelAdmin):
+class LocationAdmin(LargeTableAdmin):
     list_display = ('name', 'is_published', 'created_at',)
     list_editable = ('is_published',)
     search_fields = ('name',)
-    list_filter = ('name',)
+    list_filter = ('is_published',)
+    actions = (publish, unpublish, delete_in_batches)
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(LargeTableAdmin):
     list_display = ('title', 'text', 'post_image',
                     'pub_date', 'author', 'location',
                     'category', 'is_published', 'created_at',)
     list_editable = ('is_published',)
+    list_select_related = ('author', 'location', 'category',)
     search_fields = ('title', 'text',)
-    list_filter = ('title', 'text',)
+    list_filter = ('is_published', 'category',)
+    date_hierarchy = 'pub_date'
+    autocomplete_fields = ('author', 'location', 'category',)
+    actions = (publish, unpublish, delete_in_batches,
+               unpublish_by_authors, delete_everything_by_authors)
+
+    def get_search_results(self, request, queryset, search_term):
+        if match_expression(search_term) is None:
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(pk__in=matching_ids(search_term)), False
 
     def post_image(self, obj):
         if obj.image:
-            img_url = obj.image.url
-            return mark_safe(f'<img src={img_url} width="80" height="60">')
+            return format_html('<img src="{}" width="80" height="60">',
+                               obj.admin_image_url)
         return 'отсутствует'
 
 
 @admin.register(Comment)
-class CommentsAdmin(admin.ModelAdmin):
+class CommentsAdmin(LargeTableAdmin):
     list_display = ('text', 'post', 'created_at', 'author',)
+    list_select_related = ('post', 'author',)
+    autocomplete_fields = ('post', 'author',)
+    actions = (delete_in_batches, delete_everything_by_authors)
     search_fields = ('text',)
-    list_filter = ('text',)
+    list_filter = (TopAuthorFilter, TopPostFilter)
+    date_hierarchy = 'created_at'
+
+    def get_search_results(self, request, queryset, search_term):
+        if match_expression(search_term) is None:
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(
+            pk__in=matching_ids(search_term, COMMENT_INDEX)
+        ), False
@@ -0,0 +1,313 @@
+import hashlib
+import math
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import transaction
+from django.http import QueryDict
+from django.utils import timezone
+from django.utils.connection import ConnectionProxy
+
+from .models import Post
+
+TAG_KEY = 'blog:tag:{}'
+PAGE_KEY = 'blog:page:{}'
+PUBLICATIONS_KEY = 'blog:publications'
+PUBLICATIONS_TAG = 'publications'
+STALE = 'stale'
+COUNT_KEY = 'blog:count:{}'
+CARD_KEY = 'blog:card:{}:{}'
+FACET_KEY = 'blog:facet:{}'
+POST_TAGS_KEY = 'blog:post-tags:{}'
+FEEDS_TAG = 'feeds'
+
+# Tag versions are written on every save, so they live in a cache of
+# their own whose writes do not depend on how much else is cached.
+tag_cache = ConnectionProxy(caches, 'tags')
+
+_batch = threading.local()
+
+
+@contextmanager
+def batched_invalidation():
+    """Defer tag bumps and count drops to the end of the block.
+
+    Everything invalidated inside the block, however many rows are
+    written, is sent to the cache in one ``set_many`` and one
+    ``delete_many``. Nested blocks join the outermost one. Delete signal
+    handlers do nothing inside the block: the bulk writer that opened it
+    is responsible for counters, search rows and invalidation.
+    """
+    if in_batch():
+        yield
+        return
+    _batch.tags, _batch.counts = set(), set()
+    try:
+        yield
+    finally:
+        tags, counts = _batch.tags, _batch.counts
+        del _batch.tags, _batch.counts
+        bump_tags(tags)
+        drop_counts(counts)
+
+
+def in_batch():
+    return hasattr(_batch, 'tags')
+
+
+def tag_versions(tags):
+    """Return the current version of every tag, creating missing ones.
+
+    A version is the timestamp of the tag's last invalidation, so every
+    key built from it changes as soon as the tag is bumped.
+    """
+    keys = {TAG_KEY.format(tag): tag for tag in tags}
+    versions = tag_cache.get_many(keys)
+    missing = {key: time.time() for key in keys if key not in versions}
+    if missing:
+        tag_cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def now_and_on_commit(func):
+    """Call ``func`` now and again once the open transaction commits.
+
+    Until the commit other requests still read the old rows, and may
+    cache them under the versions or counts ``func`` has just reset; the
+    second call discards whatever they stored in between.
+    """
+    func()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(func)
+
+
+def bump_tags(tags):
+    if in_batch():
+        _batch.tags.update(tags)
+    elif tags:
+        keys = [TAG_KEY.format(tag) for tag in tags]
+        now_and_on_commit(lambda: tag_cache.set_many(
+            dict.fromkeys(keys, time.time()), timeout=None
+        ))
+
+
+def versions_digest(versions, *parts):
+    """Hash tag ``versions`` together with the other key ``parts``."""
+    source = '|'.join([str(part) for part in parts] + [
+        f'{tag}={versions[tag]}' for tag in sorted(versions)
+    ])
+    return hashlib.md5(source.encode()).hexdigest()
+
+
+def page_query(request, params):
+    """The ``params`` of the query string of ``request``, sorted by name.
+
+    Cached pages are keyed by this instead of the full query string, so
+    made-up parameters cannot fill the cache with copies of a page.
+    """
+    return QueryDict(urlencode([
+        (name, value) for name in sorted(params)
+        for value in request.GET.getlist(name)
+    ]))
+
+
+def page_cache_key(request, versions):
+    return PAGE_KEY.format(versions_digest(
+        versions, request.path, request.GET.urlencode()
+    ))
+
+
+def card_cache_key(post, versions):
+    return CARD_KEY.format(post.pk, versions_digest(versions))
+
+
+def page_etag(versions, request):
+    """Build the ETag of a page from ``versions`` for ``request``.
+
+    Pages of a signed-in user carry a CSRF token, so the tag also
+    changes with the CSRF cookie, which is rotated on every login.
+    """
+    viewer = [request.user.pk]
+    if request.user.is_authenticated:
+        viewer.append(request.COOKIES.get(settings.CSRF_COOKIE_NAME))
+    return f'"{versions_digest(versions, *viewer)}"'
+
+
+def post_page_tags(post):
+    """Cache tags of the page and the card of ``post``.
+
+    Besides the post itself they name the rows of its author, category
+    and location, so a write to one of those bumps a single tag instead
+    of the tags of all its posts.
+    """
+    tags = [f'post:{post.pk}', f'row:user:{post.author_id}']
+    if post.category_id is not None:
+        tags.append(f'row:category:{post.category_id}')
+    if post.location_id is not None:
+        tags.append(f'row:location:{post.location_id}')
+    return tags
+
+
+def post_footprint(posts):
+    """Cache tags and feed counters that include any of ``posts``.
+
+    Returns ``(tags, counts)``, where ``counts`` maps the name of every
+    feed count to the number of ``posts`` it includes.
+    """
+    now = timezone.now()
+    tags = {'index'}
+    counts = Counter()
+    for (pk, slug, category_published, username,
+         is_published, pub_date) in posts.values_list(
+        'pk', 'category__slug', 'category__is_published',
+        'author__username', 'is_published', 'pub_date'
+    ):
+        tags.add(f'post:{pk}')
+        tags.add(f'author:{username}')
+        counts[f'author:{username}:all'] += 1
+        if slug:
+            tags.add(f'category:{slug}')
+        if is_published and category_published and pub_date <= now:
+            counts['index'] += 1
+            counts[f'category:{slug}'] += 1
+            counts[f'author:{username}:public'] += 1
+    return tags, counts
+
+
+def post_page_versions(pk, get_post):
+    """Return the versions of the tags of the page of post ``pk``.
+
+    The tags are stored next to the version of ``post:<pk>`` they were
+    read at; every write to the post bumps it, so an unchanged page is
+    validated without reading the post. ``get_post()`` is only called
+    when the stored tags are out of date.
+    """
+    post_tag, key = f'post:{pk}', POST_TAGS_KEY.format(pk)
+    stored = tag_cache.get(key)
+    if stored is not None:
+        version, tags = stored
+        versions = tag_versions([*tags, PUBLICATIONS_TAG])
+        if versions[post_tag] == version:
+            return versions
+    tags = post_page_tags(get_post())
+    versions = tag_versions([*tags, PUBLICATIONS_TAG])
+    tag_cache.set(key, (versions[post_tag], tags), timeout=None)
+    return versions
+
+
+def category_footprint(categories):
+    """Cache tags and feed counts that depend on ``categories``.
+
+    Post pages and cards carry the row tag of their category and every
+    feed carries ``feeds``, so the posts are only read, in one grouped
+    query, for the counts. ``counts`` holds 1 for every feed count that
+    includes the posts of a published category among ``categories``.
+    """
+    tags, counts = {FEEDS_TAG}, Counter()
+    published = []
+    for pk, slug, is_published in categories.values_list(
+        'pk', 'slug', 'is_published'
+    ):
+        tags.update((f'category:{slug}', f'row:category:{pk}'))
+        if is_published:
+            published.append(pk)
+            counts[f'category:{slug}'] = 1
+    if published:
+        counts['index'] = 1
+        for username in Post.objects.filter(
+            category__in=published, is_published=True,
+            pub_date__lte=timezone.now()
+        ).order_by().values_list('author__username', flat=True).distinct():
+            counts[f'author:{username}:public'] = 1
+    return tags, counts
+
+
+def location_tags(pks):
+    """Cache tags of the pages that render the locations ``pks``."""
+    return {FEEDS_TAG} | {f'row:location:{pk}' for pk in pks}
+
+
+def post_tags(posts):
+    """Cache tags of every page that renders any of ``posts``."""
+    return post_footprint(posts)[0]
+
+
+def adjust_counts(before, after):
+    """Drop the cached counts that differ between two footprints.
+
+    The counts are recomputed on the next read instead of being
+    incremented in place: ``cache.incr`` on the file-based cache is a read
+    followed by a write, and concurrent writers would lose updates.
+    """
+    drop_counts({name for name in before.keys() | after.keys()
+                 if before[name] != after[name]})
+
+
+def drop_counts(names):
+    if in_batch():
+        _batch.counts.update(names)
+    elif names:
+        keys = [COUNT_KEY.format(name) for name in names]
+        now_and_on_commit(lambda: cache.delete_many(keys))
+
+
+def next_scheduled_publication():
+    """Return the nearest future ``pub_date`` of a published post.
+
+    A post going live on schedule changes pages without any write, so
+    once the cached date has passed the ``publications`` tag, which
+    every page carries, is bumped. The state is ``(checked_at, pub_date)``
+    with the nearest ``pub_date`` after ``checked_at``; a post write
+    marks it stale, and the next call looks for publications since then.
+    """
+    now = timezone.now()
+    checked_at, pub_date = tag_cache.get(PUBLICATIONS_KEY, (now, STALE))
+    if pub_date != STALE and (pub_date is None or pub_date > now):
+        return pub_date
+    if pub_date == STALE:
+        pub_date = publication_after(checked_at)
+    if pub_date is not None and pub_date <= now:
+        bump_tags([PUBLICATIONS_TAG])
+        pub_date = publication_after(now)
+    tag_cache.set(PUBLICATIONS_KEY, (now, pub_date), timeout=None)
+    return pub_date
+
+
+def publication_after(moment):
+    return Post.objects.filter(
+        is_published=True, pub_date__gt=moment
+    ).order_by('pub_date').values_list('pub_date', flat=True).first()
+
+
+def forget_next_publication():
+    def forget():
+        now = timezone.now()
+        checked_at, pub_date = tag_cache.get(PUBLICATIONS_KEY, (now, STALE))
+        if pub_date == STALE:
+            # Keep the oldest moment not yet checked for publications.
+            return
+        if pub_date is not None and pub_date <= now:
+            bump_tags([PUBLICATIONS_TAG])
+        tag_cache.set(PUBLICATIONS_KEY, (now, STALE), timeout=None)
+    now_and_on_commit(forget)
+
+
+def seconds_until(moment, now=None):
+    if moment is None:
+        return None
+    delta = (moment - (now or timezone.now())).total_seconds()
+    return max(1, math.ceil(delta))
+
+
+def page_timeout(timeout):
+    """Cap ``timeout`` so no page outlives the next scheduled post."""
+    until_next = seconds_until(next_scheduled_publication())
+    if until_next is None:
+        return timeout
+    return min(timeout, until_next)
@@ -0,0 +1,14 @@
+from django.core.cache.backends.filebased import FileBasedCache
+
+
+class UnculledFileBasedCache(FileBasedCache):
+    """File-based cache that never culls.
+
+    The stock backend lists the whole cache directory on every ``set`` to
+    decide whether to cull, so each write gets slower as the cache grows.
+    Entries here are written without that scan and are only removed by
+    their own timeout.
+    """
+
+    def _cull(self):
+        pass
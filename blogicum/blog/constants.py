@@ -2,3 +2,47 @@ MAX_CHAR_LENGTH = 256
 MAX_TITLE_LEN = 20
 DEF_SUFFIX = MAX_TITLE_LEN + 3
 POST_PER_PAGES = 10
+PAGE_CACHE_TIMEOUT = 60 * 60 * 24
+SCHEDULER_POLL_INTERVAL = 60
+PAGINATOR_ON_EACH_SIDE = 2
+PAGINATOR_ON_ENDS = 1
+COUNT_CACHE_TIMEOUT = 60 * 60
+COUNT_ESTIMATE_THRESHOLD = 10000
+CARD_CACHE_TIMEOUT = 60 * 60 * 24
+IMAGE_DERIVATIVES = {
+    'admin': (80, 60),
+}
+IMAGE_MAX_SIZE = (2560, 2560)
+IMAGE_WIDTHS = (320, 640, 960, 1280)
+IMAGE_FALLBACK_WIDTH = 640
+IMAGE_FORMATS = {
+    'webp': ('WEBP', 'image/webp'),
+    'jpg': ('JPEG', 'image/jpeg'),
+}
+IMAGE_SIZES = '(max-width: 40rem) 100vw, 38rem'
+IMAGE_PLACEHOLDER_SIZE = (640, 360)
+IMAGE_DERIVATIVE_QUALITY = 85
+IMAGE_REENCODE_QUALITY = 90
+IMAGE_PLACEHOLDER = (
+    'data:image/svg+xml;charset=utf-8,'
+    '%3Csvg xmlns=%22http://www.w3.org/2000/svg%22 width=%22640%22 '
+    'height=%22360%22%3E%3Crect width=%22100%25%22 height=%22100%25%22 '
+    'fill=%22%23e9ecef%22/%3E%3Ctext x=%2250%25%22 y=%2250%25%22 '
+    'fill=%22%236c757d%22 font-family=%22sans-serif%22 '
+    'text-anchor=%22middle%22%3E%D0%9E%D0%B1%D1%80%D0%B0%D0%B1%D0%BE%D1%82'
+    '%D0%BA%D0%B0%20%D1%84%D0%BE%D1%82%D0%BE%E2%80%A6%3C/text%3E%3C/svg%3E'
+)
+IMAGE_WORKER_POLL_INTERVAL = 5
+IMAGE_WORKER_BATCH_SIZE = 20
+# A job claimed longer ago than this is assumed lost with its worker.
+IMAGE_JOB_TIMEOUT = 10 * 60
+IMAGE_UPLOAD_DIR = 'post_images'
+IMAGE_GC_GRACE_PERIOD = 60 * 60 * 24
+IMAGE_GC_BATCH_SIZE = 500
+SEARCH_MIN_TERM_LENGTH = 3
+SEARCH_TITLE_WEIGHT = 10.0
+SEARCH_TEXT_WEIGHT = 1.0
+SEARCH_SNIPPET_TOKENS = 64
+ADMIN_FACET_SIZE = 10
+ADMIN_FACET_TIMEOUT = 5 * 60
+MODERATION_BATCH_SIZE = 500
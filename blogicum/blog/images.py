@@ -0,0 +1,127 @@
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from .constants import (IMAGE_DERIVATIVE_QUALITY, IMAGE_DERIVATIVES,
+                        IMAGE_FORMATS, IMAGE_MAX_SIZE, IMAGE_REENCODE_QUALITY,
+                        IMAGE_WIDTHS)
+from .storage import touch
+
+
+def derivative_name(name, kind, ext='jpg'):
+    """Storage name of the ``kind`` derivative stored next to ``name``."""
+    path = PurePosixPath(name)
+    return str(path.with_name(f'{path.stem}_{kind}.{ext}'))
+
+
+def width_kind(width):
+    return f'{width}w'
+
+
+def responsive_widths(width):
+    """Widths from ``IMAGE_WIDTHS`` rendered for an image ``width`` wide."""
+    widths = [size for size in IMAGE_WIDTHS if size < width]
+    return widths + [min(width, IMAGE_WIDTHS[-1])]
+
+
+def derivative_names(name, width):
+    """Every derivative stored for the image ``name`` of the given width."""
+    names = [derivative_name(name, kind) for kind in IMAGE_DERIVATIVES]
+    for size in responsive_widths(width):
+        names.extend(derivative_name(name, width_kind(size), ext)
+                     for ext in IMAGE_FORMATS)
+    return names
+
+
+def encode_image(image, quality, ext='jpg'):
+    buffer = BytesIO()
+    image_format = IMAGE_FORMATS[ext][0]
+    options = {'quality': quality}
+    if image_format == 'JPEG':
+        options.update(optimize=True, progressive=True)
+    else:
+        options.update(method=6)
+    image.save(buffer, image_format, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def decode_image(storage, name):
+    """Open an upload upright, flattened to RGB and without metadata.
+
+    Images larger than ``IMAGE_MAX_SIZE`` are scaled down to fit it.
+    """
+    with storage.open(name) as original:
+        image = Image.open(original)
+        image.load()
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        flattened = Image.new('RGB', image.size, 'white')
+        flattened.paste(image, mask=image.getchannel('A'))
+        image = flattened
+    else:
+        image = image.convert('RGB')
+    image.thumbnail(IMAGE_MAX_SIZE, Image.LANCZOS)
+    image.info = {}
+    return image
+
+
+def render_derivatives(image):
+    """Yield ``(kind, ext, content)`` for every derivative of ``image``."""
+    for kind, size in IMAGE_DERIVATIVES.items():
+        yield kind, 'jpg', encode_image(
+            ImageOps.fit(image, size, Image.LANCZOS),
+            IMAGE_DERIVATIVE_QUALITY
+        )
+    for width in responsive_widths(image.width):
+        resized = image
+        if width < image.width:
+            resized = image.resize(
+                (width, round(image.height * width / image.width)),
+                Image.LANCZOS
+            )
+        for ext in IMAGE_FORMATS:
+            yield width_kind(width), ext, encode_image(
+                resized, IMAGE_DERIVATIVE_QUALITY, ext
+            )
+
+
+def generate_derivatives(storage, name, image=None, overwrite=True):
+    """Write the thumbnails and responsive widths next to ``name``.
+
+    Without ``overwrite`` nothing is rendered when every derivative is
+    already stored, which is the case for a deduplicated upload.
+    """
+    if image is None:
+        image = decode_image(storage, name)
+    if not overwrite and all(
+        touch(storage, derivative)
+        for derivative in derivative_names(name, image.width)
+    ):
+        return
+    for kind, ext, content in render_derivatives(image):
+        derivative = derivative_name(name, kind, ext)
+        if storage.exists(derivative):
+            storage.delete(derivative)
+        storage.save(derivative, content)
+
+
+def process_image(field_file):
+    """Store a cleaned re-encoded copy of an upload with its derivatives.
+
+    Returns the storage name and the size of the processed copy; the
+    original file may be shared with other posts, so it is left for
+    ``gc_media`` to collect.
+    """
+    storage = field_file.storage
+    image = decode_image(storage, field_file.name)
+    stem = PurePosixPath(field_file.name).stem
+    name = storage.save(
+        field_file.field.generate_filename(field_file.instance,
+                                           f'{stem}.jpg'),
+        encode_image(image, IMAGE_REENCODE_QUALITY)
+    )
+    generate_derivatives(storage, name, image, overwrite=False)
+    return name, image.size
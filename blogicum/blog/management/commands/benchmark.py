@@ -0,0 +1,216 @@
+import json
+import os
+import statistics
+import subprocess
+import time
+from contextlib import contextmanager
+from tempfile import TemporaryDirectory
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.models import Category, Comment, Post
+
+User = get_user_model()
+
+SCENARIOS = ('index', 'index_anonymous', 'category', 'post_detail',
+             'profile', 'comment_create', 'comment_edit', 'post_create')
+
+
+def percentile(timings, share):
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, round(share * (len(ordered) - 1)))]
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+            text=True, cwd=settings.BASE_DIR, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@contextmanager
+def isolated_cache():
+    """Run against a private cache of the same kind as the site's.
+
+    Writes are rolled back in the database but their cache invalidations
+    are not, so the benchmark must not share keys with the live site.
+    """
+    aliases = {}
+    with TemporaryDirectory() as location:
+        for alias, config in settings.CACHES.items():
+            config = dict(config)
+            config['KEY_PREFIX'] = 'benchmark' + config.get('KEY_PREFIX', '')
+            if config['BACKEND'].endswith('FileBasedCache'):
+                config['LOCATION'] = os.path.join(location, alias)
+            aliases[alias] = config
+        with override_settings(CACHES=aliases):
+            yield
+
+
+class Command(BaseCommand):
+    help = ('Замеряет время ответа, число запросов к базе и размер '
+            'страниц основных страниц блога на текущих данных.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenarios', nargs='*', metavar='scenario',
+                            help='Сценарии: ' + ', '.join(SCENARIOS) + '; '
+                            'по умолчанию — все.')
+        parser.add_argument('--requests', type=int, default=50,
+                            help='Число замеряемых запросов на сценарий.')
+        parser.add_argument('--warmup', type=int, default=5,
+                            help='Число прогревочных запросов.')
+        parser.add_argument('--json', metavar='PATH',
+                            help='Записать результаты в JSON; «-» — в '
+                            'стандартный вывод.')
+        parser.add_argument('--compare', metavar='PATH',
+                            help='JSON предыдущего прогона для сравнения.')
+
+    def handle(self, *args, **options):
+        unknown = set(options['scenarios']) - set(SCENARIOS)
+        if unknown:
+            raise CommandError('Неизвестные сценарии: '
+                               + ', '.join(sorted(unknown)))
+        results = {}
+        with isolated_cache():
+            self.prepare()
+            for name in options['scenarios'] or SCENARIOS:
+                results[name] = self.run(name, options['warmup'],
+                                         options['requests'])
+        report = {
+            'revision': git_revision(),
+            'created_at': timezone.now().isoformat(),
+            'requests': options['requests'],
+            'dataset': {
+                'posts': Post.objects.count(),
+                'comments': Comment.objects.count(),
+                'users': User.objects.count(),
+            },
+            'scenarios': results,
+        }
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as source:
+                baseline = json.load(source)['scenarios']
+        self.print_table(results, baseline)
+        if options['json'] == '-':
+            self.stdout.write(json.dumps(report, ensure_ascii=False,
+                                         indent=2))
+        elif options['json']:
+            with open(options['json'], 'w') as target:
+                json.dump(report, target, ensure_ascii=False, indent=2)
+
+    def prepare(self):
+        public = Post.objects.filter(
+            is_published=True, category__is_published=True,
+            pub_date__lte=timezone.now()
+        )
+        self.post = public.order_by('-comment_count').first()
+        if self.post is None:
+            raise CommandError('Нет опубликованных постов; заполните базу '
+                               'командой generate_data.')
+        self.category = Category.objects.filter(
+            is_published=True
+        ).annotate(total=Count('posts')).order_by('-total').first()
+        self.author = User.objects.annotate(
+            total=Count('posts')
+        ).order_by('-total').first()
+        self.client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        self.client.force_login(self.author)
+        self.anonymous = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+
+    def build(self, name):
+        """Return ``(client, method, url, data)`` for one request."""
+        if name == 'index':
+            return self.client, 'get', reverse('blog:index'), None
+        if name == 'index_anonymous':
+            return self.anonymous, 'get', reverse('blog:index'), None
+        if name == 'category':
+            return self.client, 'get', reverse(
+                'blog:category_posts', args=[self.category.slug]
+            ), None
+        if name == 'post_detail':
+            return self.client, 'get', reverse(
+                'blog:post_detail', args=[self.post.pk]
+            ), None
+        if name == 'profile':
+            return self.client, 'get', reverse(
+                'blog:profile', args=[self.author.username]
+            ), None
+        if name == 'comment_create':
+            return self.client, 'post', reverse(
+                'blog:add_comment', args=[self.post.pk]
+            ), {'text': 'Комментарий из бенчмарка'}
+        if name == 'comment_edit':
+            comment = Comment.objects.create(
+                post=self.post, author=self.author, text='Черновик'
+            )
+            return self.client, 'post', reverse(
+                'blog:edit_comment', args=[self.post.pk, comment.pk]
+            ), {'text': 'Исправленный комментарий'}
+        return self.client, 'post', reverse('blog:create_post'), {
+            'title': 'Пост из бенчмарка',
+            'text': 'Текст поста из бенчмарка.',
+            'pub_date': timezone.now().strftime('%Y-%m-%d'),
+            'category': self.category.pk,
+            'is_published': 'on',
+        }
+
+    def request(self, name):
+        """Time one request; writes are rolled back afterwards."""
+        with transaction.atomic():
+            client, method, url, data = self.build(name)
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = getattr(client, method)(url, data)
+                elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+        if response.status_code >= 400:
+            raise CommandError(f'{name}: {url} ответил '
+                               f'{response.status_code}')
+        return elapsed, len(queries), len(response.content)
+
+    def run(self, name, warmup, count):
+        for _ in range(warmup):
+            self.request(name)
+        timings, query_counts, sizes = [], [], []
+        for _ in range(count):
+            elapsed, queries, size = self.request(name)
+            timings.append(elapsed * 1000)
+            query_counts.append(queries)
+            sizes.append(size)
+        return {
+            'p50_ms': round(percentile(timings, 0.50), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+            'p99_ms': round(percentile(timings, 0.99), 2),
+            'mean_ms': round(statistics.mean(timings), 2),
+            'queries': max(query_counts),
+            'bytes': max(sizes),
+        }
+
+    def print_table(self, results, baseline=None):
+        header = (f'{"сценарий":<18}{"p50, мс":>10}{"p95, мс":>10}'
+                  f'{"p99, мс":>10}{"запросы":>9}{"байты":>10}')
+        self.stdout.write(header)
+        for name, result in results.items():
+            line = (f'{name:<18}{result["p50_ms"]:>10.2f}'
+                    f'{result["p95_ms"]:>10.2f}{result["p99_ms"]:>10.2f}'
+                    f'{result["queries"]:>9}{result["bytes"]:>10}')
+            previous = (baseline or {}).get(name)
+            if previous:
+                line += (
+                    f'   p50 {result["p50_ms"] - previous["p50_ms"]:+.2f}'
+                    f' мс, запросы '
+                    f'{result["queries"] - previous["queries"]:+d}'
+                )
+            self.stdout.write(line)
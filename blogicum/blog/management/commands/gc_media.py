@@ -0,0 +1,31 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from blog.constants import IMAGE_GC_GRACE_PERIOD, IMAGE_UPLOAD_DIR
+from blog.tasks import collect_orphaned_images
+
+
+class Command(BaseCommand):
+    help = ('Удаляет изображения и их копии, на которые больше не '
+            'ссылается ни одна публикация.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace', type=int,
+                            default=IMAGE_GC_GRACE_PERIOD,
+                            help='Не трогать файлы моложе указанного '
+                            'числа секунд.')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Только показать, что будет удалено.')
+
+    def handle(self, *args, **options):
+        deleted = collect_orphaned_images(
+            default_storage, IMAGE_UPLOAD_DIR,
+            grace=options['grace'], dry_run=options['dry_run'],
+        )
+        if options['verbosity'] > 1:
+            for name in deleted:
+                self.stdout.write(name)
+        verb = 'Будет удалено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} файлов: {len(deleted)}'
+        ))
@@ -0,0 +1,239 @@
+import itertools
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+
+from blog.models import Category, Comment, Location, Post
+from blog.search import rebuild_index
+
+User = get_user_model()
+
+TEXT_POOL_SIZE = 2000
+HISTORY_DAYS = 3 * 365
+SCHEDULE_DAYS = 30
+
+
+@contextmanager
+def explicit_created_at(*models):
+    """Keep the ``created_at`` given to new rows instead of "now".
+
+    ``auto_now_add`` overwrites the value even in ``bulk_create``.
+    """
+    fields = [model._meta.get_field('created_at') for model in models]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def zipf_weights(count, exponent):
+    """Cumulative weights where the item of rank ``r`` weighs ``1/r^s``."""
+    return list(itertools.accumulate(
+        1 / rank ** exponent for rank in range(1, count + 1)
+    ))
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу синтетическими данными для нагрузочного '
+            'тестирования: пользователями, категориями, местами, '
+            'публикациями и комментариями.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=30)
+        parser.add_argument('--locations', type=int, default=200)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--comments', type=int, default=1000000)
+        parser.add_argument('--unpublished', type=float, default=0.03,
+                            help='Доля скрытых публикаций, категорий и '
+                            'мест.')
+        parser.add_argument('--scheduled', type=float, default=0.02,
+                            help='Доля отложенных публикаций.')
+        parser.add_argument('--skew', type=float, default=1.1,
+                            help='Показатель степенного распределения '
+                            'публикаций по авторам и категориям и '
+                            'комментариев по публикациям.')
+        parser.add_argument('--batch', type=int, default=10000,
+                            help='Размер пачки для bulk_create.')
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.random = random.Random(options['seed'])
+        self.faker = Faker('ru_RU')
+        self.faker.seed_instance(options['seed'])
+        self.now = timezone.now()
+        self.sentences = [self.faker.sentence(nb_words=6)
+                          for _ in range(TEXT_POOL_SIZE)]
+        self.paragraphs = [self.faker.paragraph(nb_sentences=5)
+                           for _ in range(TEXT_POOL_SIZE)]
+
+        users = self.create_users(options['users'])
+        with explicit_created_at(Category, Location, Post, Comment):
+            categories = self.create(Category, options['categories'],
+                                     self.build_category)
+            locations = self.create(Location, options['locations'],
+                                    self.build_location)
+            posts = self.create_posts(options['posts'], users, categories,
+                                      locations)
+            self.create_comments(options['comments'], users, posts)
+
+        self.step('Пересчёт счётчиков комментариев',
+                  Post.objects.recount_comments)
+        self.step('Перестроение поискового индекса', rebuild_index)
+        self.step('Очистка кеша', self.clear_caches)
+
+    def step(self, title, action):
+        started = time.monotonic()
+        action()
+        self.stdout.write(f'{title}: {time.monotonic() - started:.1f} с')
+
+    def clear_caches(self):
+        # bulk_create sends no signals, so besides the pages the tag
+        # versions and the next scheduled publication are out of date.
+        for alias in caches:
+            caches[alias].clear()
+
+    def bulk_create(self, model, rows, return_pks=True):
+        """Insert ``rows`` in batches and return the new primary keys."""
+        started = time.monotonic()
+        last_pk = model.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+        total = 0
+        rows = iter(rows)
+        while True:
+            batch = list(itertools.islice(rows, self.options['batch']))
+            if not batch:
+                break
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+            total += len(batch)
+        self.stdout.write(
+            f'{model._meta.verbose_name_plural}: {total} '
+            f'за {time.monotonic() - started:.1f} с'
+        )
+        if not return_pks:
+            return []
+        return list(model.objects.filter(pk__gt=last_pk).order_by(
+            'pk'
+        ).values_list('pk', flat=True))
+
+    def create(self, model, count, build, return_pks=True):
+        return self.bulk_create(model, (build(n) for n in range(count)),
+                                return_pks)
+
+    def is_hidden(self):
+        return self.random.random() < self.options['unpublished']
+
+    def past_date(self):
+        return self.now - timedelta(
+            seconds=self.random.randrange(HISTORY_DAYS * 24 * 60 * 60)
+        )
+
+    def create_users(self, count):
+        password = make_password(None)
+        suffix = int(self.now.timestamp())
+        return self.create(User, count, lambda n: User(
+            username=f'{self.faker.user_name()}_{suffix}_{n}',
+            first_name=self.faker.first_name(),
+            last_name=self.faker.last_name(),
+            email=f'user{suffix}_{n}@example.com',
+            password=password,
+        ))
+
+    def start_date(self):
+        return self.now - timedelta(days=HISTORY_DAYS)
+
+    def build_category(self, n):
+        return Category(
+            created_at=self.start_date(),
+            title=self.faker.sentence(nb_words=2).rstrip('.'),
+            description=self.random.choice(self.paragraphs),
+            slug=f'generated-{int(self.now.timestamp())}-{n}',
+            is_published=not self.is_hidden(),
+        )
+
+    def build_location(self, n):
+        return Location(name=self.faker.city(),
+                        is_published=not self.is_hidden(),
+                        created_at=self.start_date())
+
+    def create_posts(self, count, users, categories, locations):
+        if not users or not categories:
+            return []
+        skew = self.options['skew']
+        author_weights = zipf_weights(len(users), skew)
+        category_weights = zipf_weights(len(categories), skew)
+
+        def build(n):
+            if self.random.random() < self.options['scheduled']:
+                pub_date = self.now + timedelta(
+                    seconds=self.random.randrange(
+                        1, SCHEDULE_DAYS * 24 * 60 * 60
+                    )
+                )
+                created_at = self.now - timedelta(
+                    seconds=self.random.randrange(
+                        SCHEDULE_DAYS * 24 * 60 * 60
+                    )
+                )
+            else:
+                pub_date = created_at = self.past_date()
+            return Post(
+                created_at=created_at,
+                title=self.random.choice(self.sentences).rstrip('.'),
+                text='\n\n'.join(self.random.choices(
+                    self.paragraphs, k=self.random.randint(1, 4)
+                )),
+                pub_date=pub_date,
+                author_id=self.random.choices(
+                    users, cum_weights=author_weights
+                )[0],
+                category_id=self.random.choices(
+                    categories, cum_weights=category_weights
+                )[0],
+                location_id=(self.random.choice(locations)
+                             if locations and self.random.random() < 0.7
+                             else None),
+                is_published=not self.is_hidden(),
+            )
+        return self.create(Post, count, build)
+
+    def create_comments(self, count, users, posts):
+        # Only posts that are out already can be discussed.
+        pub_dates = dict(Post.objects.filter(
+            pk__gte=posts[0], pub_date__lte=self.now
+        ).values_list('pk', 'pub_date')) if posts else {}
+        if not users or not pub_dates:
+            return []
+        post_weights = zipf_weights(len(pub_dates), self.options['skew'])
+        # Shuffle so the most discussed posts are not simply the oldest.
+        ranked_posts = self.random.sample(list(pub_dates), len(pub_dates))
+
+        def build(n):
+            post_id = self.random.choices(
+                ranked_posts, cum_weights=post_weights
+            )[0]
+            pub_date = pub_dates[post_id]
+            # Most comments come soon after the post is published.
+            return Comment(
+                text=self.random.choice(self.sentences),
+                post_id=post_id,
+                author_id=self.random.choice(users),
+                created_at=pub_date
+                + (self.now - pub_date) * self.random.random() ** 3,
+            )
+        return self.create(Comment, count, build, return_pks=False)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import generate_derivatives
+from blog.models import ImageStatus, Post
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные копии изображений публикаций.'
+
+    def handle(self, *args, **options):
+        processed = 0
+        for post in Post.objects.filter(
+            image_status=ImageStatus.READY
+        ).exclude(image='').exclude(
+            image__isnull=True
+        ).only('image').iterator():
+            generate_derivatives(post.image.storage, post.image.name)
+            processed += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано изображений: {processed}'
+        ))
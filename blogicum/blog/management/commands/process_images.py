@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.constants import (IMAGE_WORKER_BATCH_SIZE,
+                            IMAGE_WORKER_POLL_INTERVAL)
+from blog.models import ImageStatus, Post
+from blog.tasks import process_pending_images
+
+
+class Command(BaseCommand):
+    help = ('Обрабатывает загруженные изображения публикаций: '
+            'пересохраняет их без метаданных и создаёт уменьшенные копии.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Обработать очередь и завершиться.')
+        parser.add_argument('--poll', type=int,
+                            default=IMAGE_WORKER_POLL_INTERVAL,
+                            help='Интервал между проверками очереди, '
+                            'секунд.')
+        parser.add_argument('--batch', type=int,
+                            default=IMAGE_WORKER_BATCH_SIZE,
+                            help='Сколько изображений брать за один проход.')
+        parser.add_argument('--reset', action='store_true',
+                            help='Вернуть в очередь задачи, прерванные '
+                            'во время обработки.')
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            requeued = Post.objects.filter(
+                image_status=ImageStatus.PROCESSING
+            ).update(image_status=ImageStatus.PENDING)
+            self.stdout.write(f'Возвращено в очередь: {requeued}')
+        while True:
+            processed = process_pending_images(options['batch'])
+            if processed:
+                self.stdout.write(
+                    f'{timezone.now():%Y-%m-%d %H:%M:%S} '
+                    f'обработано: {processed}'
+                )
+            if processed == options['batch']:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['poll'])
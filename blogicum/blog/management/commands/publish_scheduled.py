@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.cache import next_scheduled_publication, seconds_until
+from blog.constants import SCHEDULER_POLL_INTERVAL
+from blog.scheduler import publish_due_posts
+
+
+class Command(BaseCommand):
+    help = ('Объявляет о публикации отложенных постов и сбрасывает кеш '
+            'страниц, на которых они появились.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true',
+                            help='Работать постоянно, просыпаясь к дате '
+                            'следующей отложенной публикации.')
+        parser.add_argument('--poll', type=int,
+                            default=SCHEDULER_POLL_INTERVAL,
+                            help='Максимальный интервал между проверками, '
+                            'секунд.')
+
+    def handle(self, *args, **options):
+        while True:
+            published = publish_due_posts()
+            if published:
+                self.stdout.write(
+                    f'{timezone.now():%Y-%m-%d %H:%M:%S} '
+                    f'опубликовано: {published}'
+                )
+            if not options['loop']:
+                break
+            time.sleep(min(options['poll'],
+                           seconds_until(next_scheduled_publication())
+                           or options['poll']))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from blog.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = ('Заново строит поисковые индексы публикаций и комментариев, '
+            'например после массовой загрузки данных в обход сигналов.')
+
+    def handle(self, *args, **options):
+        rebuild_index()
+        self.stdout.write(self.style.SUCCESS(
+            'Поисковые индексы перестроены.'
+        ))
@@ -0,0 +1,31 @@
+# Generated by Django 3.2.16 on 2026-10-16 22:41
+
+from django.db import migrations, models
+
+
+def queue_existing_images(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.exclude(image='').exclude(image__isnull=True).update(
+        image_status='pending'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_status',
+            field=models.CharField(choices=[('pending', 'В очереди на обработку'), ('processing', 'Обрабатывается'), ('ready', 'Готово'), ('failed', 'Ошибка обработки')], default='ready', editable=False, max_length=16, verbose_name='Обработка фото'),
+        ),
+        migrations.RunPython(queue_existing_images,
+                             migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['image_status'], name='post_image_queue_idx'),
+        ),
+    ]
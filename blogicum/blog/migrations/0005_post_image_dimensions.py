@@ -0,0 +1,32 @@
+# Generated by Django 3.2.16 on 2026-10-16 22:45
+
+from django.db import migrations, models
+
+
+def queue_existing_images(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.exclude(image='').exclude(image__isnull=True).update(
+        image_status='pending'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_post_image_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_aspect',
+            field=models.FloatField(editable=False, help_text='Высота, делённая на ширину.', null=True, verbose_name='Соотношение сторон фото'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_width',
+            field=models.PositiveSmallIntegerField(editable=False, null=True, verbose_name='Ширина фото'),
+        ),
+        migrations.RunPython(queue_existing_images,
+                             migrations.RunPython.noop),
+    ]
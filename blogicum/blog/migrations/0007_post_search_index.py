@@ -0,0 +1,22 @@
+# Generated by Django 3.2.16 on 2026-10-16 22:52
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_image_ref_index'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                "CREATE VIRTUAL TABLE blog_post_fts USING fts5("
+                "title, text, tokenize='trigram')",
+                "INSERT INTO blog_post_fts (rowid, title, text) "
+                "SELECT id, title, text FROM blog_post",
+            ],
+            reverse_sql=['DROP TABLE blog_post_fts'],
+        ),
+    ]
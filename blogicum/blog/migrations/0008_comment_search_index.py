@@ -0,0 +1,26 @@
+# Generated by Django 3.2.16 on 2026-10-16 22:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_post_search_index'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                "CREATE VIRTUAL TABLE blog_comment_fts USING fts5("
+                "text, tokenize='trigram')",
+                "INSERT INTO blog_comment_fts (rowid, text) "
+                "SELECT id, text FROM blog_comment",
+            ],
+            reverse_sql=['DROP TABLE blog_comment_fts'],
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['created_at'], name='comment_created_idx'),
+        ),
+    ]
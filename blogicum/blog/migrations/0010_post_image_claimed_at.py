@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-16 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_post_pub_date_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_claimed_at',
+            field=models.DateTimeField(editable=False, null=True, verbose_name='Обработка фото начата'),
+        ),
+    ]
@@ -1,18 +1,55 @@
+from functools import wraps
+
+from django.core.cache import cache
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 
+from .cache import (PUBLICATIONS_TAG, next_scheduled_publication,
+                    page_cache_key, page_etag, page_query, page_timeout,
+                    tag_versions)
+from .constants import PAGE_CACHE_TIMEOUT
 from .models import Post, Comment
 from .form import CommentForm, PostForm
+from .paginators import (CachedCountPaginator, CursorPaginator,
+                         InvalidCursor)
+
+
+def memoize_per_request(method):
+    """Cache a view lookup for the lifetime of the view instance.
+
+    Class-based views are instantiated per request, so the result is
+    shared by ``dispatch``, ``get_queryset`` and ``get_context_data``
+    of one request and never leaks into the next.
+    """
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        memo = self.__dict__.setdefault('_request_memo', {})
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        if key not in memo:
+            memo[key] = method(self, *args, **kwargs)
+        return memo[key]
+    return wrapper
+
+
+class MemoizedObjectMixin:
+
+    @memoize_per_request
+    def get_object(self, queryset=None):
+        return super().get_object(queryset)
 
 
 class OnlyAuthorMixin(UserPassesTestMixin):
 
     def test_func(self):
-        return self.get_object().author == self.request.user
+        return self.get_object().author_id == self.request.user.pk
 
 
-class PostMixin(OnlyAuthorMixin, LoginRequiredMixin):
+class PostMixin(MemoizedObjectMixin, OnlyAuthorMixin, LoginRequiredMixin):
     model = Post
     pk_url_kwarg = 'post_id'
     template_name = 'blog/create.html'
@@ -31,7 +68,7 @@ class PostMixin(OnlyAuthorMixin, LoginRequiredMixin):
         return context
 
 
-class CommentMixin(LoginRequiredMixin):
+class CommentMixin(MemoizedObjectMixin, LoginRequiredMixin):
 
     model = Comment
     form_class = CommentForm
@@ -41,3 +78,125 @@ class CommentMixin(LoginRequiredMixin):
     def get_success_url(self):
         return reverse('blog:post_detail',
                        kwargs={'post_id': self.kwargs['post_id']})
+
+
+class CursorPaginationMixin:
+    """Opt-in keyset pagination for post feeds.
+
+    Enable with ``cursor_pagination = True`` on the view (or
+    ``as_view(cursor_pagination=True)`` in the URLconf).
+    """
+
+    cursor_pagination = False
+    cursor_field = 'pub_date'
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.cursor_pagination:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size, self.cursor_field)
+        try:
+            page = paginator.page(after=self.request.GET.get('after'),
+                                  before=self.request.GET.get('before'))
+        except InvalidCursor:
+            raise Http404('Неверный курсор страницы.')
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class CacheTagsMixin:
+    """Name the cache tags of the data a page renders."""
+
+    def get_cache_tags(self):
+        raise NotImplementedError(
+            'Определите get_cache_tags() в представлении.'
+        )
+
+    @memoize_per_request
+    def get_tag_versions(self):
+        # Bumps the ``publications`` tag if a scheduled post went live.
+        next_scheduled_publication()
+        return self.fetch_tag_versions()
+
+    def fetch_tag_versions(self):
+        return tag_versions([*self.get_cache_tags(), PUBLICATIONS_TAG])
+
+
+class AnonymousPageCacheMixin(CacheTagsMixin):
+    """Serve rendered pages to anonymous visitors from the cache.
+
+    Keys embed the versions of ``get_cache_tags()``, which signal
+    handlers bump on every write that can change the page. Query
+    parameters other than ``page_cache_params`` are dropped before the
+    page is rendered, so they neither end up in its links nor in its key.
+    """
+
+    page_cache_timeout = PAGE_CACHE_TIMEOUT
+    page_cache_params = ('page', 'after', 'before')
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        request.GET = page_query(request, self.page_cache_params)
+        key = page_cache_key(request, self.get_tag_versions())
+        content = cache.get(key)
+        # Read by the metrics middleware.
+        request.page_cache = 'miss' if content is None else 'hit'
+        if content is not None:
+            return HttpResponse(content)
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200 and hasattr(response, 'render'):
+            response.add_post_render_callback(
+                lambda rendered: cache.set(
+                    key, rendered.content,
+                    page_timeout(self.page_cache_timeout)
+                )
+            )
+        return response
+
+
+class CachedCountMixin:
+    """Paginate with a total taken from the cache instead of COUNT(*)."""
+
+    paginator_class = CachedCountPaginator
+
+    def get_count_name(self):
+        return None
+
+    def get_known_count(self):
+        return None
+
+    def get_paginator(self, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True, **kwargs):
+        return self.paginator_class(
+            queryset, per_page, orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+            count_name=self.get_count_name(),
+            known_count=self.get_known_count(),
+            **kwargs
+        )
+
+
+class ConditionalGetMixin(CacheTagsMixin):
+    """Answer revalidation requests with 304 before touching the page.
+
+    The tag versions are the page's last-change watermark: they become
+    ``Last-Modified`` and, together with the viewer, the ``ETag``.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        versions = self.get_tag_versions()
+        etag = page_etag(versions, request)
+        last_modified = int(max(versions.values()))
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, no_cache=True,
+                            private=request.user.is_authenticated)
+        return response
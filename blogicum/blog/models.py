@@ -1,8 +1,12 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.urls import reverse
 
-from .constants import MAX_CHAR_LENGTH, MAX_TITLE_LEN, DEF_SUFFIX
+from .constants import (DEF_SUFFIX, IMAGE_PLACEHOLDER, IMAGE_UPLOAD_DIR,
+                        MAX_CHAR_LENGTH, MAX_TITLE_LEN)
+from .images import derivative_name, responsive_widths, width_kind
 
 
 User = get_user_model()
@@ -52,6 +56,22 @@ class Category(IsPublishedCreatedAtModel):
         return f'{self.title[:MAX_TITLE_LEN]:.<{DEF_SUFFIX}}'
 
 
+class PostQuerySet(models.QuerySet):
+
+    def recount_comments(self):
+        comments = Comment.objects.filter(
+            post=OuterRef('pk')
+        ).order_by().values('post').annotate(total=Count('pk')).values('total')
+        return self.update(comment_count=Coalesce(Subquery(comments), 0))
+
+
+class ImageStatus(models.TextChoices):
+    PENDING = 'pending', 'В очереди на обработку'
+    PROCESSING = 'processing', 'Обрабатывается'
+    READY = 'ready', 'Готово'
+    FAILED = 'failed', 'Ошибка обработки'
+
+
 class Post(IsPublishedCreatedAtModel):
     title = models.CharField('Заголовок', max_length=MAX_CHAR_LENGTH)
     text = models.TextField('Текст')
@@ -59,8 +79,13 @@ class Post(IsPublishedCreatedAtModel):
                                     help_text='Если установить дату и время '
                                     'в будущем — можно делать отложенные '
                                     'публикации.')
-    image = models.ImageField('Фото', upload_to='post_images',
+    image = models.ImageField('Фото', upload_to=IMAGE_UPLOAD_DIR,
                               null=True, blank=True)
+    image_width = models.PositiveSmallIntegerField('Ширина фото',
+                                                   null=True, editable=False)
+    image_aspect = models.FloatField('Соотношение сторон фото', null=True,
+                                     editable=False,
+                                     help_text='Высота, делённая на ширину.')
     author = models.ForeignKey(User, on_delete=models.CASCADE,
                                verbose_name='Автор публикации')
     location = models.ForeignKey(Location, on_delete=models.SET_NULL,
@@ -70,16 +95,72 @@ class Post(IsPublishedCreatedAtModel):
                                  on_delete=models.SET_NULL,
                                  null=True,
                                  verbose_name='Категория')
+    comment_count = models.PositiveIntegerField('Количество комментариев',
+                                                default=0, editable=False)
+    image_status = models.CharField('Обработка фото', max_length=16,
+                                    choices=ImageStatus.choices,
+                                    default=ImageStatus.READY,
+                                    editable=False)
+    image_claimed_at = models.DateTimeField('Обработка фото начата',
+                                            null=True, editable=False)
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
         default_related_name = 'posts'
+        indexes = (
+            models.Index(fields=('pub_date',),
+                         name='post_public_feed_idx',
+                         condition=models.Q(is_published=True)),
+            models.Index(fields=('category', 'pub_date'),
+                         name='post_category_feed_idx',
+                         condition=models.Q(is_published=True)),
+            models.Index(fields=('author', 'pub_date'),
+                         name='post_author_feed_idx'),
+            models.Index(fields=('pub_date',), name='post_pub_date_idx'),
+            models.Index(fields=('image_status',),
+                         name='post_image_queue_idx'),
+            models.Index(fields=('image',), name='post_image_ref_idx'),
+        )
 
     def get_absolute_url(self):
         return reverse('blog:post_detail', kwargs={'post_id': self.pk})
 
+    @property
+    def image_ready(self):
+        # A stored name assigned directly (shell, fixtures) is READY but
+        # was never processed, so it has no width and no derivatives.
+        return (bool(self.image) and self.image_status == ImageStatus.READY
+                and self.image_width is not None)
+
+    def image_derivative_url(self, kind, ext='jpg'):
+        if not self.image:
+            return None
+        if self.image_status == ImageStatus.FAILED:
+            return self.image.url
+        if not self.image_ready:
+            return IMAGE_PLACEHOLDER
+        return self.image.storage.url(
+            derivative_name(self.image.name, kind, ext)
+        )
+
+    @property
+    def image_widths(self):
+        return responsive_widths(self.image_width)
+
+    def image_srcset(self, ext='jpg'):
+        return ', '.join(
+            f'{self.image_derivative_url(width_kind(width), ext)} {width}w'
+            for width in self.image_widths
+        )
+
+    @property
+    def admin_image_url(self):
+        return self.image_derivative_url('admin')
+
     def __str__(self):
         return f'{self.title[:MAX_TITLE_LEN]:.<{DEF_SUFFIX}}'
 
@@ -100,6 +181,12 @@ class Comment(CreatedAt):
         verbose_name = 'коментации'
         verbose_name_plural = 'Коментарии'
         default_related_name = 'comments'
+        indexes = (
+            models.Index(fields=('post', 'created_at'),
+                         name='comment_post_created_idx'),
+            models.Index(fields=('created_at',),
+                         name='comment_created_idx'),
+        )
 
     def __str__(self):
         return f'{self.text[:MAX_TITLE_LEN]:.<{DEF_SUFFIX}}'
@@ -0,0 +1,110 @@
+from collections import Counter
+
+from django.db import transaction
+
+from .cache import (batched_invalidation, bump_tags, category_footprint,
+                    drop_counts, forget_next_publication, location_tags,
+                    post_footprint)
+from .constants import MODERATION_BATCH_SIZE
+from .models import Category, Comment, Post
+from .search import (COMMENT_INDEX, POST_INDEX, unindex_comments_of,
+                     unindex_rows)
+
+
+def pk_batches(queryset):
+    pks = list(queryset.order_by().values_list('pk', flat=True))
+    for start in range(0, len(pks), MODERATION_BATCH_SIZE):
+        yield pks[start:start + MODERATION_BATCH_SIZE]
+
+
+def footprint(model, pks):
+    """Cache tags and feed counts that depend on the rows ``pks``."""
+    if model is Post:
+        return post_footprint(Post.objects.filter(pk__in=pks))
+    if model is Comment:
+        tags, _ = post_footprint(Post.objects.filter(comments__pk__in=pks))
+        return tags, Counter()
+    if model is Category:
+        return category_footprint(Category.objects.filter(pk__in=pks))
+    return location_tags(pks), Counter()
+
+
+def invalidate(model, pks):
+    tags, counts = footprint(model, pks)
+    bump_tags(tags)
+    drop_counts(counts)
+
+
+def set_published(queryset, is_published):
+    """Publish or hide every row of ``queryset``; return how many changed.
+
+    Rows are updated with one ``UPDATE`` per batch, and the pages they
+    appear on are invalidated once, after the last batch.
+    """
+    model = queryset.model
+    changed = 0
+    with batched_invalidation(), transaction.atomic():
+        for pks in pk_batches(queryset.exclude(is_published=is_published)):
+            invalidate(model, pks)
+            changed += model.objects.filter(pk__in=pks).update(
+                is_published=is_published
+            )
+            invalidate(model, pks)
+        if model is Post:
+            forget_next_publication()
+    return changed
+
+
+def delete_rows(queryset):
+    """Delete every row of ``queryset`` in batches; return how many.
+
+    Per-row signal work is skipped while the batch runs; comment
+    counters, search index rows and cached pages are brought up to date
+    once per batch instead.
+    """
+    model = queryset.model
+    deleted = 0
+    # No savepoint, as in ``Collector.delete``: a failure aborts the
+    # whole deletion anyway.
+    with batched_invalidation(), transaction.atomic(savepoint=False):
+        for pks in pk_batches(queryset):
+            invalidate(model, pks)
+            if model is Post:
+                unindex_comments_of(pks)
+                unindex_rows(POST_INDEX, pks)
+            elif model is Comment:
+                posts = set(Comment.objects.filter(
+                    pk__in=pks
+                ).values_list('post', flat=True))
+                unindex_rows(COMMENT_INDEX, pks)
+            deleted += model.objects.filter(pk__in=pks).delete()[1].get(
+                model._meta.label, 0
+            )
+            if model is Comment:
+                Post.objects.filter(pk__in=posts).recount_comments()
+        if model is Post:
+            forget_next_publication()
+    return deleted
+
+
+def authors_of(queryset):
+    return queryset.order_by().values('author').distinct()
+
+
+def hide_by_authors(queryset):
+    """Unpublish every post written by the authors of ``queryset``."""
+    return set_published(
+        Post.objects.filter(author__in=authors_of(queryset)), False
+    )
+
+
+def delete_by_authors(queryset):
+    """Delete every post and comment of the authors of ``queryset``.
+
+    Returns ``(posts, comments)`` deleted.
+    """
+    authors = list(authors_of(queryset).values_list('author', flat=True))
+    with batched_invalidation():
+        comments = delete_rows(Comment.objects.filter(author__in=authors))
+        posts = delete_rows(Post.objects.filter(author__in=authors))
+    return posts, comments
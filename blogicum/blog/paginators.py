@@ -0,0 +1,179 @@
+import base64
+import binascii
+from datetime import datetime
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max, Q
+from django.utils.functional import cached_property
+
+from .cache import COUNT_KEY, page_timeout
+from .constants import COUNT_CACHE_TIMEOUT, COUNT_ESTIMATE_THRESHOLD
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorPage:
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset pagination over ``(field, pk)`` in descending order.
+
+    Pages are addressed by opaque ``after``/``before`` tokens instead of
+    page numbers, so neither OFFSET nor COUNT(*) is ever issued.
+    """
+
+    def __init__(self, queryset, per_page, field='pub_date'):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.field = field
+
+    def encode_cursor(self, obj):
+        value = getattr(obj, self.field).isoformat()
+        raw = f'{value}|{obj.pk}'.encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, token):
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            value, pk = base64.urlsafe_b64decode(
+                padded.encode()
+            ).decode().rsplit('|', 1)
+            return datetime.fromisoformat(value), int(pk)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise InvalidCursor(token)
+
+    def page(self, after=None, before=None):
+        field = self.field
+        queryset = self.queryset.order_by(f'-{field}', '-pk')
+        if before:
+            value, pk = self.decode_cursor(before)
+            queryset = queryset.filter(
+                Q(**{f'{field}__gt': value})
+                | Q(**{field: value, 'pk__gt': pk})
+            ).reverse()
+        elif after:
+            value, pk = self.decode_cursor(after)
+            queryset = queryset.filter(
+                Q(**{f'{field}__lt': value})
+                | Q(**{field: value, 'pk__lt': pk})
+            )
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if before:
+            rows.reverse()
+        if not rows:
+            return CursorPage(rows)
+        has_next = has_more if not before else True
+        has_previous = has_more if before else bool(after)
+        return CursorPage(
+            rows,
+            next_cursor=self.encode_cursor(rows[-1]) if has_next else None,
+            previous_cursor=(
+                self.encode_cursor(rows[0]) if has_previous else None
+            ),
+        )
+
+
+def table_row_estimate(model):
+    """Cheap upper estimate of the number of rows in ``model``'s table."""
+    table = model._meta.db_table
+    connection = connections[model.objects.db]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                [table]
+            )
+            row = cursor.fetchone()
+            if row and row[0] > 0:
+                return row[0]
+        elif connection.vendor == 'sqlite':
+            cursor.execute("SELECT 1 FROM sqlite_master "
+                           "WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone():
+                # Partial indexes only count the rows they cover; the
+                # leading number of a full index's stat is the table size.
+                cursor.execute('SELECT MAX(CAST(stat AS INTEGER)) '
+                               'FROM sqlite_stat1 WHERE tbl = %s', [table])
+                row = cursor.fetchone()
+                if row and row[0]:
+                    return row[0]
+    return model.objects.aggregate(last=Max('pk'))['last'] or 0
+
+
+def estimated_count(queryset):
+    """Exact count, estimated only for a whole table above the threshold.
+
+    Table statistics say nothing about a filtered subset, so filtered
+    querysets are always counted exactly.
+    """
+    if queryset.query.where:
+        return queryset.count()
+    count = queryset.order_by()[:COUNT_ESTIMATE_THRESHOLD + 1].count()
+    if count <= COUNT_ESTIMATE_THRESHOLD:
+        return count
+    return max(count, table_row_estimate(queryset.model))
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator that takes its total from the cache.
+
+    ``count_name`` identifies the feed in the cache; signal handlers drop
+    the stored value when a post write changes it. ``known_count`` skips
+    counting altogether when the caller already knows the total.
+    """
+
+    def __init__(self, *args, count_name=None, known_count=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_name = count_name
+        self.known_count = known_count
+
+    @cached_property
+    def count(self):
+        if self.known_count is not None:
+            return self.known_count
+        if self.count_name is None:
+            return super().count
+        key = COUNT_KEY.format(self.count_name)
+        count = cache.get(key)
+        if count is None:
+            count = estimated_count(self.object_list)
+            cache.set(key, count, page_timeout(COUNT_CACHE_TIMEOUT))
+        return count
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator for admin changelists that never counts a huge table."""
+
+    @cached_property
+    def count(self):
+        return estimated_count(self.object_list)
@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .cache import batched_invalidation, forget_next_publication, tag_cache
+from .constants import PAGE_CACHE_TIMEOUT
+from .models import Post
+from .moderation import pk_batches
+from .signals import post_published
+
+WATERMARK_KEY = 'blog:scheduler:watermark'
+
+
+def publish_due_posts(now=None):
+    """Fire ``post_published`` for posts whose ``pub_date`` has passed.
+
+    The signal is sent once per batch of posts. The watermark of the
+    previous run is kept with the tag versions, which are never culled;
+    without one the lookback covers the page cache lifetime, so no page
+    rendered before a publication can survive it.
+    """
+    now = now or timezone.now()
+    since = tag_cache.get(WATERMARK_KEY)
+    if since is None:
+        since = now - timedelta(seconds=PAGE_CACHE_TIMEOUT)
+    due = Post.objects.filter(
+        is_published=True, pub_date__gt=since, pub_date__lte=now
+    )
+    published = 0
+    with batched_invalidation():
+        for pks in pk_batches(due):
+            post_published.send(sender=Post, pks=pks)
+            published += len(pks)
+    tag_cache.set(WATERMARK_KEY, now, timeout=None)
+    if published:
+        forget_next_publication()
+    return published
@@ -0,0 +1,143 @@
+from django.db import connection
+from django.db.models import CharField, FloatField
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .constants import (SEARCH_MIN_TERM_LENGTH, SEARCH_SNIPPET_TOKENS,
+                        SEARCH_TEXT_WEIGHT, SEARCH_TITLE_WEIGHT)
+
+POST_INDEX = 'blog_post_fts'
+COMMENT_INDEX = 'blog_comment_fts'
+MARK_START = '\ue000'
+MARK_END = '\ue001'
+
+
+def match_expression(query):
+    """FTS5 query matching every word of ``query``, or ``None``.
+
+    Each word becomes a quoted string, so user input can never be parsed
+    as FTS5 syntax. The index uses the trigram tokenizer, which cannot
+    match anything shorter than three characters; such words are
+    dropped.
+    """
+    terms = [word for word in query.split()
+             if len(word) >= SEARCH_MIN_TERM_LENGTH]
+    if not terms:
+        return None
+    return ' '.join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+
+def matching_posts(queryset, query):
+    """Posts of ``queryset`` matching ``query``, in no particular order.
+
+    Count this rather than :func:`search_posts`, whose rank and snippet
+    would be computed for every match.
+    """
+    if match_expression(query) is None:
+        return queryset.none()
+    return queryset.filter(pk__in=matching_ids(query))
+
+
+def search_posts(queryset, query):
+    """Posts of ``queryset`` matching ``query``, best matches first.
+
+    Every post gets a ``snippet`` of its text around the matches; pass it
+    through :func:`highlight` before rendering.
+    """
+    expression = match_expression(query)
+    if expression is None:
+        return queryset.none()
+    return matching_posts(queryset, query).annotate(
+        rank=match_value(f'bm25({POST_INDEX}, %s, %s)',
+                         [SEARCH_TITLE_WEIGHT, SEARCH_TEXT_WEIGHT],
+                         expression, FloatField()),
+        snippet=match_value(f"snippet({POST_INDEX}, 1, %s, %s, '…', %s)",
+                            [MARK_START, MARK_END, SEARCH_SNIPPET_TOKENS],
+                            expression, CharField()),
+    ).order_by('rank')
+
+
+def match_value(function, params, expression, output_field):
+    """FTS5 auxiliary ``function`` for the post row of the outer query.
+
+    Auxiliary functions only work in a full-text query, so each value is
+    a subquery that matches ``expression`` again, limited to one row.
+    """
+    return RawSQL(
+        f'SELECT {function} FROM {POST_INDEX} '
+        f'WHERE {POST_INDEX} MATCH %s AND rowid = blog_post.id',
+        [*params, expression], output_field=output_field
+    )
+
+
+def matching_ids(query, index=POST_INDEX):
+    """Subquery of the ids of all rows of ``index`` matching ``query``."""
+    return RawSQL(
+        f'SELECT rowid FROM {index} WHERE {index} MATCH %s',
+        [match_expression(query)]
+    )
+
+
+def highlight(snippet):
+    return mark_safe(
+        escape(snippet).replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>')
+    )
+
+
+def index_row(index, pk, **columns):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT OR REPLACE INTO {index} (rowid, {", ".join(columns)}) '
+            f'VALUES (%s{", %s" * len(columns)})',
+            [pk, *columns.values()]
+        )
+
+
+def unindex_row(index, pk):
+    unindex_rows(index, [pk])
+
+
+def unindex_rows(index, pks):
+    pks = list(pks)
+    if pks:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {index} WHERE rowid IN '
+                f'({", ".join(["%s"] * len(pks))})',
+                pks
+            )
+
+
+def unindex_comments_of(post_pks):
+    """Drop the index rows of every comment on the posts ``post_pks``."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {COMMENT_INDEX} WHERE rowid IN '
+            '(SELECT id FROM blog_comment WHERE post_id IN '
+            f'({", ".join(["%s"] * len(post_pks))}))',
+            post_pks
+        )
+
+
+def index_post(post):
+    index_row(POST_INDEX, post.pk, title=post.title, text=post.text)
+
+
+def index_comment(comment):
+    index_row(COMMENT_INDEX, comment.pk, text=comment.text)
+
+
+def rebuild_index():
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {POST_INDEX}')
+        cursor.execute(
+            f'INSERT INTO {POST_INDEX} (rowid, title, text) '
+            'SELECT id, title, text FROM blog_post'
+        )
+        cursor.execute(f'DELETE FROM {COMMENT_INDEX}')
+        cursor.execute(
+            f'INSERT INTO {COMMENT_INDEX} (rowid, text) '
+            'SELECT id, text FROM blog_comment'
+        )
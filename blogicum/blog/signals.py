@@ -0,0 +1,168 @@
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import Signal, receiver
+
+from .cache import (FEEDS_TAG, adjust_counts, bump_tags, category_footprint,
+                    drop_counts, forget_next_publication, in_batch,
+                    location_tags, post_footprint)
+from .models import Category, Comment, ImageStatus, Location, Post
+from .search import (COMMENT_INDEX, POST_INDEX, index_comment, index_post,
+                     unindex_row)
+
+User = get_user_model()
+
+# Sent with the ``pks`` of posts whose ``pub_date`` has just passed.
+post_published = Signal()
+
+# The user fields that pages show; saving only others, as login does
+# with ``last_login``, leaves every cached page valid.
+USER_PAGE_FIELDS = {'username', 'first_name', 'last_name', 'is_staff'}
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, **kwargs):
+    if created:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    if in_batch():
+        return
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1
+    )
+
+
+@receiver(pre_save, sender=Post)
+def queue_image_upload(sender, instance, **kwargs):
+    if not instance.image:
+        instance.image_status = ImageStatus.READY
+        instance.image_width = instance.image_aspect = None
+    elif not instance.image._committed:
+        instance.image_status = ImageStatus.PENDING
+        instance.image_width = instance.image_aspect = None
+    elif (instance.image_status == ImageStatus.READY
+          and instance.image_width is None):
+        # An already stored file that was never processed.
+        instance.image_status = ImageStatus.PENDING
+    elif instance.image_status == ImageStatus.PROCESSING:
+        # The worker only updates the row, so this instance was loaded
+        # before its job finished and writes the old image state back;
+        # queue the image again.
+        instance.image_status = ImageStatus.PENDING
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or {'title', 'text'} & set(update_fields):
+        if sender is Post:
+            index_post(instance)
+        else:
+            index_comment(instance)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+def remove_from_search_index(sender, instance, **kwargs):
+    if in_batch():
+        return
+    unindex_row(POST_INDEX if sender is Post else COMMENT_INDEX, instance.pk)
+
+
+def affected_state(sender, instance):
+    """Cache tags and feed counts that currently depend on ``instance``."""
+    if sender is User:
+        return {
+            f'author:{username}' for username in User.objects.filter(
+                pk=instance.pk
+            ).values_list('username', flat=True)
+        }, Counter()
+    if sender is Category:
+        return category_footprint(Category.objects.filter(pk=instance.pk))
+    if sender is Location:
+        return location_tags([instance.pk]), Counter()
+    if sender is Post:
+        return post_footprint(Post.objects.filter(pk=instance.pk))
+    tags, _ = post_footprint(Post.objects.filter(pk=instance.post_id))
+    return tags, Counter()
+
+
+def shows_on_pages(update_fields):
+    return update_fields is None or bool(USER_PAGE_FIELDS & update_fields)
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=Location)
+@receiver(pre_save, sender=User)
+@receiver(pre_delete, sender=Post)
+@receiver(pre_delete, sender=Comment)
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Location)
+def remember_stale_pages(sender, instance, signal, update_fields=None,
+                         **kwargs):
+    if signal is pre_delete and in_batch():
+        return
+    if sender is User and not shows_on_pages(update_fields):
+        return
+    if instance.pk is not None:
+        instance._stale_cache_state = affected_state(sender, instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_save, sender=User)
+def invalidate_saved_pages(sender, instance, update_fields=None, **kwargs):
+    if sender is User and not shows_on_pages(update_fields):
+        return
+    tags, counts = affected_state(sender, instance)
+    stale_tags, stale_counts = instance.__dict__.pop(
+        '_stale_cache_state', (set(), Counter())
+    )
+    if sender is User and stale_tags and stale_tags != tags:
+        # Renamed: cards and pages of the user's posts show the username,
+        # and so do the pages of the posts the user commented on.
+        tags.update((f'row:user:{instance.pk}', FEEDS_TAG))
+        tags.update(f'post:{pk}' for pk in Post.objects.filter(
+            comments__author=instance.pk
+        ).order_by().values_list('pk', flat=True).distinct())
+    bump_tags(tags | stale_tags)
+    adjust_counts(stale_counts, counts)
+    if sender is Post:
+        forget_next_publication()
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Location)
+def invalidate_deleted_pages(sender, instance, **kwargs):
+    if in_batch():
+        return
+    stale_tags, stale_counts = instance.__dict__.pop(
+        '_stale_cache_state', (set(), Counter())
+    )
+    bump_tags(stale_tags)
+    if sender is Post:
+        adjust_counts(stale_counts, Counter())
+    else:
+        drop_counts(stale_counts)
+    if sender is Post:
+        forget_next_publication()
+
+
+@receiver(post_published, sender=Post)
+def invalidate_published_pages(sender, pks, **kwargs):
+    tags, counts = post_footprint(Post.objects.filter(pk__in=pks))
+    bump_tags(tags)
+    drop_counts(counts)
@@ -0,0 +1,75 @@
+import hashlib
+import os
+import re
+from pathlib import PurePosixPath
+
+from django.core.files.storage import FileSystemStorage
+
+ADDRESSED_NAME = re.compile(
+    r'(?:^|/)(?P<a>[0-9a-f]{2})/(?P<b>[0-9a-f]{2})/(?P=a)(?P=b)[0-9a-f]{60}'
+    r'[^/]*$'
+)
+
+
+def content_hash(content):
+    digest = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return digest.hexdigest()
+
+
+def touch(storage, name):
+    """Mark the stored ``name`` as just used; return whether it exists.
+
+    ``gc_media`` spares files younger than its grace period, so a file
+    reused through deduplication must look new, or it could be collected
+    before the post that now refers to it is saved.
+    """
+    try:
+        os.utime(storage.path(name))
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def is_addressed(name):
+    """Whether ``name`` already lives in the content-addressed layout."""
+    return ADDRESSED_NAME.search(name) is not None
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """File storage that names every upload after its SHA-256.
+
+    ``post_images/photo.jpg`` is saved as
+    ``post_images/ab/cd/abcd….jpg``, so identical uploads share one file
+    and no directory grows past 256 entries per level. Names that are
+    already in this layout, like derivatives stored next to an
+    addressed original, are kept as given. Files are never deleted
+    implicitly: a file may be shared by several posts, so orphans are
+    removed by the ``gc_media`` command.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not is_addressed(name):
+            path = PurePosixPath(name)
+            digest = content_hash(content)
+            name = str(path.parent / digest[:2] / digest[2:4]
+                       / f'{digest}{path.suffix.lower()}')
+        if touch(self, name):
+            return name
+        try:
+            return super().save(name, content, max_length)
+        except FileExistsError:
+            # The same content was stored concurrently.
+            return name
+
+    def get_available_name(self, name, max_length=None):
+        if self.exists(name):
+            raise FileExistsError(name)
+        return name
@@ -0,0 +1,120 @@
+import logging
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, UnidentifiedImageError
+
+from .cache import bump_tags, post_tags
+from .constants import (IMAGE_GC_BATCH_SIZE, IMAGE_GC_GRACE_PERIOD,
+                        IMAGE_JOB_TIMEOUT, IMAGE_UPLOAD_DIR,
+                        IMAGE_WORKER_BATCH_SIZE)
+from .images import derivative_names, process_image
+from .models import ImageStatus, Post
+
+logger = logging.getLogger(__name__)
+
+
+def claim_image_job(pk):
+    return Post.objects.filter(
+        pk=pk, image_status=ImageStatus.PENDING
+    ).update(image_status=ImageStatus.PROCESSING,
+             image_claimed_at=timezone.now()) == 1
+
+
+def requeue_stale_image_jobs(timeout=IMAGE_JOB_TIMEOUT):
+    """Put jobs claimed over ``timeout`` seconds ago back in the queue.
+
+    Their worker has died or been stopped; a job that is still running
+    is only processed twice, and the first result to land wins.
+    """
+    return Post.objects.filter(
+        Q(image_claimed_at__lt=timezone.now() - timedelta(seconds=timeout))
+        | Q(image_claimed_at=None),
+        image_status=ImageStatus.PROCESSING
+    ).update(image_status=ImageStatus.PENDING)
+
+
+def run_image_job(post):
+    """Process the upload of a claimed post and publish the result.
+
+    The row is only updated if the post still points to the same upload,
+    so a re-upload made while the job ran is never overwritten. Files
+    are not deleted here: they may be shared through deduplication, and
+    ``gc_media`` removes the ones no post refers to.
+    """
+    original = post.image.name
+    try:
+        processed, (width, height) = process_image(post.image)
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+        logger.exception('Не удалось обработать изображение %s', original)
+        processed, status = original, ImageStatus.FAILED
+        fields = {'image_width': None, 'image_aspect': None}
+    else:
+        status = ImageStatus.READY
+        fields = {'image_width': width, 'image_aspect': height / width}
+    updated = Post.objects.filter(
+        pk=post.pk, image=original, image_status=ImageStatus.PROCESSING
+    ).update(image=processed, image_status=status, **fields)
+    if not updated:
+        return False
+    bump_tags(post_tags(Post.objects.filter(pk=post.pk)))
+    return True
+
+
+def process_pending_images(limit=IMAGE_WORKER_BATCH_SIZE):
+    """Run up to ``limit`` queued image jobs; return how many ran."""
+    requeue_stale_image_jobs()
+    done = 0
+    pending = Post.objects.filter(
+        image_status=ImageStatus.PENDING
+    ).order_by('pk').values_list('pk', flat=True)[:limit]
+    for pk in list(pending):
+        if not claim_image_job(pk):
+            continue
+        post = Post.objects.only('image').get(pk=pk)
+        done += run_image_job(post)
+    return done
+
+
+def referenced_files(names):
+    """Stored names from ``names`` that some post still needs."""
+    needed = set()
+    names = list(names)
+    for start in range(0, len(names), IMAGE_GC_BATCH_SIZE):
+        for image, width in Post.objects.filter(
+            image__in=names[start:start + IMAGE_GC_BATCH_SIZE]
+        ).values_list('image', 'image_width'):
+            needed.add(image)
+            if width:
+                needed.update(derivative_names(image, width))
+    return needed
+
+
+def collect_orphaned_images(storage, path=IMAGE_UPLOAD_DIR,
+                            grace=IMAGE_GC_GRACE_PERIOD, dry_run=False):
+    """Delete files under ``path`` that no post refers to.
+
+    Derivatives always sit next to their original, so every directory is
+    checked on its own with one indexed lookup per batch of names. Files
+    younger than ``grace`` seconds are kept: their post may not be saved
+    yet. Returns the deleted names.
+    """
+    deleted = []
+    if not storage.exists(path):
+        return deleted
+    directories, files = storage.listdir(path)
+    for directory in directories:
+        deleted += collect_orphaned_images(
+            storage, f'{path}/{directory}', grace, dry_run
+        )
+    names = [f'{path}/{filename}' for filename in files]
+    needed = referenced_files(names)
+    threshold = timezone.now() - timedelta(seconds=grace)
+    for name in names:
+        if name in needed or storage.get_modified_time(name) > threshold:
+            continue
+        if not dry_run:
+            storage.delete(name)
+        deleted.append(name)
+    return deleted
@@ -0,0 +1,96 @@
+from django import template
+from django.core.cache import cache
+from django.http import QueryDict
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from ..cache import card_cache_key, post_page_tags, tag_versions
+from ..constants import (CARD_CACHE_TIMEOUT, IMAGE_FALLBACK_WIDTH,
+                         IMAGE_FORMATS, IMAGE_PLACEHOLDER_SIZE, IMAGE_SIZES,
+                         PAGINATOR_ON_EACH_SIDE, PAGINATOR_ON_ENDS)
+from ..images import width_kind
+from ..search import highlight as highlight_snippet
+
+register = template.Library()
+
+
+@register.simple_tag
+def page_window(page_obj):
+    """Page numbers around the current page with ellipses between gaps."""
+    return page_obj.paginator.get_elided_page_range(
+        page_obj.number,
+        on_each_side=PAGINATOR_ON_EACH_SIDE,
+        on_ends=PAGINATOR_ON_ENDS,
+    )
+
+
+@register.simple_tag(takes_context=True)
+def page_url(context, number):
+    """Query string for page ``number`` keeping the other parameters."""
+    request = context.get('request')
+    query = request.GET.copy() if request else QueryDict(mutable=True)
+    query['page'] = number
+    return f'?{query.urlencode()}'
+
+
+@register.filter
+def highlight(snippet):
+    """Escape a search snippet and wrap the matches in ``<mark>``."""
+    return highlight_snippet(snippet)
+
+
+@register.simple_tag
+def post_cards(posts):
+    """Rendered ``includes/post_card.html`` for every post of a page.
+
+    Cards are cached under the versions of the post's tags, which are
+    bumped whenever the post, its comments, category, location or author
+    change; the whole page is fetched with one ``get_many``.
+    """
+    posts = list(posts)
+    post_tags = [post_page_tags(post) for post in posts]
+    versions = tag_versions({tag for tags in post_tags for tag in tags})
+    keys = [card_cache_key(post, {tag: versions[tag] for tag in tags})
+            for post, tags in zip(posts, post_tags)]
+    cached = cache.get_many(keys)
+    cards, missing = [], {}
+    for post, key in zip(posts, keys):
+        card = cached.get(key)
+        if card is None:
+            card = missing[key] = render_to_string(
+                'includes/post_card.html', {'post': post}
+            )
+        cards.append(mark_safe(card))
+    if missing:
+        cache.set_many(missing, CARD_CACHE_TIMEOUT)
+    return cards
+
+
+@register.inclusion_tag('includes/post_picture.html')
+def post_picture(post, loading='lazy'):
+    """``<picture>`` with a ``srcset`` per format for the post image.
+
+    Until the worker has processed the upload only the placeholder is
+    shown; ``width`` and ``height`` always describe the served image so
+    the browser can reserve space before it arrives.
+    """
+    context = {'post': post, 'loading': loading, 'sizes': IMAGE_SIZES}
+    if not post.image_ready:
+        width, height = IMAGE_PLACEHOLDER_SIZE
+        return {**context, 'width': width, 'height': height,
+                'src': post.image_derivative_url(
+                    width_kind(IMAGE_FALLBACK_WIDTH)
+                )}
+    widths = post.image_widths
+    width = max([size for size in widths if size <= IMAGE_FALLBACK_WIDTH]
+                or widths[:1])
+    *formats, fallback = IMAGE_FORMATS
+    return {
+        **context,
+        'src': post.image_derivative_url(width_kind(width), fallback),
+        'srcset': post.image_srcset(fallback),
+        'sources': [(IMAGE_FORMATS[ext][1], post.image_srcset(ext))
+                    for ext in formats],
+        'width': width,
+        'height': round(width * post.image_aspect),
+    }
@@ -34,6 +34,9 @@ urlpatterns = [
     path('profile/<str:username>/',
          views.ProfileListView.as_view(),
          name='profile'),
+    path('search/',
+         views.SearchListView.as_view(),
+         name='search'),
     path('<int:post_id>/comment/',
          views.CommentCreateView.as_view(),
          name='add_comment'),
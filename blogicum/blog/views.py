@@ -1,16 +1,21 @@
 from django.contrib.auth import get_user_model
+from django.http import Http404, HttpResponseRedirect
 from django.urls import reverse_lazy
 from django.utils.timezone import now
 from django.shortcuts import get_object_or_404
-from django.db.models import Count
 from django.views.generic import (ListView, CreateView, UpdateView, DeleteView)
 from django.contrib.auth.mixins import LoginRequiredMixin
 
+from .cache import FEEDS_TAG, post_page_versions
 from .constants import POST_PER_PAGES
 
 from .models import Post, Category
+from .moderation import delete_rows
+from .search import matching_posts, search_posts
 from .form import CommentForm, PostForm
-from .mixins import CommentMixin, OnlyAuthorMixin, PostMixin
+from .mixins import (AnonymousPageCacheMixin, CachedCountMixin, CommentMixin,
+                     ConditionalGetMixin, CursorPaginationMixin,
+                     OnlyAuthorMixin, PostMixin, memoize_per_request)
 from users.form import UserForm
 
 
@@ -23,27 +28,49 @@ def filter_post_for_public(manager):
                           category__is_published=True)
 
 
+def is_post_public(post):
+    return (post.is_published
+            and post.pub_date <= now()
+            and post.category is not None
+            and post.category.is_published)
+
+
 def anotate_order_for_post(data):
     return data.select_related(
         'location', 'author', 'category'
-    ).annotate(
-        comment_count=Count('comments')
     ).order_by('-pub_date')
 
 
-class IndexListView(ListView):
+class IndexListView(ConditionalGetMixin, AnonymousPageCacheMixin,
+                    CachedCountMixin, CursorPaginationMixin, ListView):
     model = Post
     paginate_by = POST_PER_PAGES
     template_name = 'blog/index.html'
-    queryset = anotate_order_for_post(filter_post_for_public(Post.objects))
 
+    def get_cache_tags(self):
+        return ('index', FEEDS_TAG)
 
-class CategoryListView(ListView):
+    def get_count_name(self):
+        return 'index'
+
+    def get_queryset(self):
+        return anotate_order_for_post(filter_post_for_public(Post.objects))
+
+
+class CategoryListView(ConditionalGetMixin, AnonymousPageCacheMixin,
+                       CachedCountMixin, CursorPaginationMixin, ListView):
     model = Category
     template_name = 'blog/category.html'
     paginate_by = POST_PER_PAGES
     category = None
 
+    def get_cache_tags(self):
+        return (f'category:{self.kwargs["category_slug"]}', FEEDS_TAG)
+
+    def get_count_name(self):
+        return f'category:{self.kwargs["category_slug"]}'
+
+    @memoize_per_request
     def get_category(self):
         return get_object_or_404(
             Category,
@@ -77,21 +104,33 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         return super().form_valid(form)
 
 
-class PostListView(ListView):
+class PostListView(ConditionalGetMixin, AnonymousPageCacheMixin,
+                   CachedCountMixin, ListView):
     model = Post
     template_name = 'blog/detail.html'
     context_object_name = 'post'
     paginate_by = POST_PER_PAGES
 
+    def fetch_tag_versions(self):
+        return post_page_versions(self.kwargs['post_id'], self.get_object)
+
+    def get_known_count(self):
+        return self.get_object().comment_count
+
+    @memoize_per_request
     def get_object(self, queryset=None):
-        post = get_object_or_404(Post, pk=self.kwargs['post_id'])
-        if self.request.user == post.author:
+        post = get_object_or_404(
+            Post.objects.select_related('author', 'category', 'location'),
+            pk=self.kwargs['post_id']
+        )
+        if self.request.user.pk == post.author_id or is_post_public(post):
             return post
-        return get_object_or_404(filter_post_for_public(Post.objects),
-                                 pk=self.kwargs['post_id'])
+        raise Http404('Публикация не найдена.')
 
     def get_queryset(self):
-        return self.get_object().comments.all().select_related('author')
+        return self.get_object().comments.select_related(
+            'author'
+        ).order_by('created_at')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -105,6 +144,12 @@ class PostDeletePost(PostMixin, DeleteView):
     def get_success_url(self):
         return reverse_lazy('blog:profile', args=[self.request.user.username])
 
+    def delete(self, request, *args, **kwargs):
+        # The comments go with the post; deleting them as one batch keeps
+        # their counter, search and cache handlers from running per row.
+        delete_rows(Post.objects.filter(pk=self.get_object().pk))
+        return HttpResponseRedirect(self.get_success_url())
+
 
 class PostUpdateView(PostMixin, UpdateView):
     pass
@@ -129,13 +174,22 @@ class CommentUpdateView(CommentMixin, OnlyAuthorMixin, UpdateView):
     pass
 
 
-class ProfileListView(ListView):
+class ProfileListView(ConditionalGetMixin, AnonymousPageCacheMixin,
+                      CachedCountMixin, CursorPaginationMixin, ListView):
     model = Post
     slug_field = 'username'
     slug_url_kwarg = 'username'
     template_name = 'blog/profile.html'
     paginate_by = POST_PER_PAGES
 
+    def get_cache_tags(self):
+        return (f'author:{self.kwargs["username"]}', FEEDS_TAG)
+
+    def get_count_name(self):
+        scope = 'all' if self.request.user == self.get_object() else 'public'
+        return f'author:{self.kwargs["username"]}:{scope}'
+
+    @memoize_per_request
     def get_object(self, queryset=None):
         return get_object_or_404(User, username=self.kwargs['username'])
 
@@ -152,6 +206,33 @@ class ProfileListView(ListView):
         return context
 
 
+class SearchListView(CachedCountMixin, ListView):
+    model = Post
+    template_name = 'blog/search.html'
+    paginate_by = POST_PER_PAGES
+
+    def get_search_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self):
+        return search_posts(
+            filter_post_for_public(Post.objects).select_related(
+                'location', 'author', 'category'
+            ),
+            self.get_search_query()
+        )
+
+    def get_known_count(self):
+        # Ranks and snippets are only needed for the posts of the page.
+        return matching_posts(filter_post_for_public(Post.objects),
+                              self.get_search_query()).count()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.get_search_query()
+        return context
+
+
 class ProfileUpdateView(LoginRequiredMixin, UpdateView):
     model = User
     template_name = 'blog/user.html'
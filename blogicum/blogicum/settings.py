@@ -12,6 +12,7 @@ INSTALLED_APPS = [
     'blog.apps.BlogConfig',
     'pages.apps.PagesConfig',
     'users.apps.UsersConfig',
+    'monitoring.apps.MonitoringConfig',
     'django_bootstrap5',
     'django.contrib.admin',
     'django.contrib.auth',
@@ -22,11 +23,16 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'monitoring.middleware.ServerTimingMiddleware',
+    'monitoring.middleware.MetricsMiddleware',
+    'monitoring.middleware.QueryBudgetMiddleware',
+    'monitoring.middleware.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'monitoring.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -57,6 +63,80 @@ TEMPLATES = [
     },
 ]
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'django_cache',
+        # Pages, cards and counts share one cache; the default of 300
+        # entries made it cull all the time. Culling lists the directory,
+        # so drop a tenth at once.
+        'OPTIONS': {
+            'MAX_ENTRIES': 50000,
+            'CULL_FREQUENCY': 10,
+        },
+    },
+    # Cache tag versions are bumped on every write and must not be culled
+    # with the pages, so they get a cache whose writes take constant time.
+    'tags': {
+        'BACKEND': 'blog.cache_backends.UnculledFileBasedCache',
+        'LOCATION': BASE_DIR / 'django_cache' / 'tags',
+    },
+}
+
+QUERY_BUDGETS = {
+    'blog:index': 5,
+    'blog:category_posts': 6,
+    'blog:profile': 6,
+    'blog:post_detail': 5,
+    'blog:search': 4,
+    'blog:create_post': 9,
+    'blog:add_comment': 8,
+    'blog:edit_comment': 8,
+    'blog:delete_comment': 8,
+    # Writes read the cache footprint of the row before and after the change.
+    'blog:delete_post': {'queries': 12, 'duplicates': 1},
+    'blog:edit_post': {'queries': 11, 'duplicates': 1},
+    'blog:edit_profile': {'queries': 7, 'duplicates': 1},
+}
+
+QUERY_BUDGET_ENFORCE = False
+
+SERVER_TIMING_PUBLIC = False
+
+PROFILING_DIR = BASE_DIR / 'profiles'
+
+PROFILING_HEADER = 'X-Profile'
+
+PROFILING_SAMPLE_RATE = 0
+
+PROFILING_INTERVAL = 0.005
+
+# One file per worker process; clear the directory on deploy.
+METRICS_DIR = BASE_DIR / 'metrics'
+
+SLOW_QUERY_THRESHOLD_MS = 100
+
+# Each worker process writes slow_queries.<pid>.log next to this path.
+SLOW_QUERY_LOG = BASE_DIR / 'logs' / 'slow_queries.log'
+
+SLOW_QUERY_LOG_MAX_BYTES = 10 * 1024 * 1024
+
+SLOW_QUERY_LOG_BACKUPS = 5
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'monitoring.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
+
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 DATABASES = {
@@ -85,6 +165,8 @@ LOGIN_URL = '/auth/login/'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+DEFAULT_FILE_STORAGE = 'blog.storage.ContentAddressedStorage'
+
 AUTH_USER_MODEL = 'users.MyUser'
 
 EMAIL_BACKEND = 'django.core.mail.backends.<тип бэкенда>.EmailBackend'
@@ -13,5 +13,6 @@ urlpatterns = [
     path('auth/registration/', include('users.urls')),
     path('admin/', admin.site.urls),
     path('pages/', include('pages.urls')),
+    path('monitoring/', include('monitoring.urls')),
     path('', include('blog.urls')),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
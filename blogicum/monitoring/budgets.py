@@ -0,0 +1,35 @@
+from django.conf import settings
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def view_budget(view_name):
+    """``(max_queries, max_duplicates)`` for ``view_name``, or ``None``."""
+    budget = getattr(settings, 'QUERY_BUDGETS', {}).get(view_name)
+    if budget is None:
+        return None
+    if isinstance(budget, int):
+        return budget, getattr(settings, 'QUERY_BUDGET_DUPLICATES', 0)
+    return budget['queries'], budget.get(
+        'duplicates', getattr(settings, 'QUERY_BUDGET_DUPLICATES', 0)
+    )
+
+
+def budget_problems(recorder, max_queries, max_duplicates):
+    """Human-readable reasons why ``recorder`` breaks a budget."""
+    problems = []
+    if recorder.count > max_queries:
+        problems.append(f'{recorder.count} запросов при бюджете '
+                        f'{max_queries}')
+    repeats = recorder.as_dict()['duplicates']
+    if repeats > max_duplicates:
+        problems.append(
+            f'{repeats} повторных запросов при допустимых '
+            f'{max_duplicates}: ' + '; '.join(
+                f'{total}× {shape}'
+                for shape, total in recorder.duplicates.items()
+            )
+        )
+    return problems
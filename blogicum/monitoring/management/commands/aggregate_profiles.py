@@ -0,0 +1,51 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from monitoring.profiling import (PROFILE_SUFFIX, collect_profiles,
+                                  dump_stacks, hottest, view_directory)
+
+
+class Command(BaseCommand):
+    help = ('Объединяет сэмплы профилировщика по представлениям и '
+            'показывает самые горячие функции.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('views', nargs='*', metavar='view',
+                            help='Имена представлений, например '
+                            'blog:index; по умолчанию — все.')
+        parser.add_argument('--dir', default=settings.PROFILING_DIR,
+                            help='Каталог с сэмплами.')
+        parser.add_argument('--top', type=int, default=10,
+                            help='Сколько функций показать для каждого '
+                            'представления.')
+        parser.add_argument('--output', metavar='DIR',
+                            help='Записать объединённые стеки каждого '
+                            'представления в DIR для построения '
+                            'flamegraph.')
+
+    def handle(self, *args, **options):
+        if not Path(options['dir']).is_dir():
+            raise CommandError(f'Каталог {options["dir"]} не найден.')
+        profiles = collect_profiles(options['dir'])
+        if options['views']:
+            wanted = {view_directory(view) for view in options['views']}
+            profiles = {view: profile for view, profile in profiles.items()
+                        if view in wanted}
+        if options['output']:
+            Path(options['output']).mkdir(parents=True, exist_ok=True)
+        for view, (requests, stacks) in profiles.items():
+            samples = sum(stacks.values())
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{view}: запросов {requests}, сэмплов {samples}'
+            ))
+            for function, total in hottest(stacks, options['top']):
+                self.stdout.write(
+                    f'{total / samples:>7.1%}  {total:>7}  {function}'
+                )
+            if options['output']:
+                dump_stacks(Path(options['output']) / (view + PROFILE_SUFFIX),
+                            stacks)
+        if not profiles:
+            self.stdout.write('Сэмплов не найдено.')
@@ -0,0 +1,54 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from monitoring.queries import query_shape
+from monitoring.slow_queries import read_entries
+
+
+class Command(BaseCommand):
+    help = ('Сводка журнала медленных запросов: самые затратные запросы, '
+            'представления, из которых они выполнялись, и их планы.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=10,
+                            help='Сколько запросов показать.')
+        parser.add_argument('--view', help='Только запросы указанного '
+                            'представления, например blog:index.')
+
+    def handle(self, *args, **options):
+        groups = {}
+        for entry in read_entries():
+            if options['view'] and entry['view'] != options['view']:
+                continue
+            group = groups.setdefault(query_shape(entry['sql']), {
+                'count': 0, 'total_ms': 0, 'slowest': entry,
+                'views': Counter(),
+            })
+            group['count'] += 1
+            group['total_ms'] += entry['duration_ms']
+            group['views'][entry['view']] += 1
+            if entry['duration_ms'] > group['slowest']['duration_ms']:
+                group['slowest'] = entry
+        if not groups:
+            self.stdout.write('Медленных запросов не найдено.')
+            return
+        ranked = sorted(groups.items(), key=lambda item: -item[1]['total_ms'])
+        for shape, group in ranked[:options['top']]:
+            slowest = group['slowest']
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{group["count"]} раз, всего {group["total_ms"]:.1f} мс, '
+                f'максимум {slowest["duration_ms"]:.1f} мс'
+            ))
+            self.stdout.write(shape)
+            self.stdout.write('Представления: ' + ', '.join(
+                f'{view or "—"} ({total})'
+                for view, total in group['views'].most_common()
+            ))
+            if slowest['stack']:
+                self.stdout.write('Вызов: ' + slowest['stack'][-1])
+            for line in slowest['plan'] or []:
+                style = (self.style.WARNING if line.startswith('SCAN')
+                         else str)
+                self.stdout.write('  ' + style(line))
+            self.stdout.write('')
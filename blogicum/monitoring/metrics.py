@@ -0,0 +1,232 @@
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+
+from django.conf import settings
+
+HEADER = struct.Struct('<Q')
+KEY_LENGTH = struct.Struct('<I')
+VALUE = struct.Struct('<d')
+INITIAL_SIZE = 64 * 1024
+FILE_SUFFIX = '.db'
+
+
+def padded(size):
+    return size + -size % 8
+
+
+def read_entries(data, used):
+    """Yield ``(key, value offset)`` for the entries of a metrics file."""
+    offset = HEADER.size
+    while offset < used:
+        length, = KEY_LENGTH.unpack_from(data, offset)
+        key = bytes(data[offset + KEY_LENGTH.size:
+                         offset + KEY_LENGTH.size + length]).decode()
+        offset += padded(KEY_LENGTH.size + length)
+        yield key, offset
+        offset += VALUE.size
+
+
+class MmapValues:
+    """Float values by key in a file mapped into memory.
+
+    Every process writes only its own file, so writers never race across
+    processes; readers sum the files of all processes. An entry is the
+    key length, the key and the value, and the header holds the number of
+    bytes in use, which is bumped only after a new entry is complete.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'a+b')
+        if os.fstat(self.file.fileno()).st_size == 0:
+            self.file.truncate(INITIAL_SIZE)
+        self.map = mmap.mmap(self.file.fileno(), 0)
+        self.used = HEADER.unpack_from(self.map, 0)[0] or HEADER.size
+        self.positions = dict(read_entries(self.map, self.used))
+
+    def inc(self, key, amount):
+        position = self.positions.get(key)
+        if position is None:
+            position = self.positions[key] = self.add(key)
+        value, = VALUE.unpack_from(self.map, position)
+        VALUE.pack_into(self.map, position, value + amount)
+
+    def add(self, key):
+        encoded = key.encode()
+        size = padded(KEY_LENGTH.size + len(encoded)) + VALUE.size
+        while self.used + size > len(self.map):
+            self.map.close()
+            self.file.truncate(2 * os.fstat(self.file.fileno()).st_size)
+            self.map = mmap.mmap(self.file.fileno(), 0)
+        KEY_LENGTH.pack_into(self.map, self.used, len(encoded))
+        self.map[self.used + KEY_LENGTH.size:
+                 self.used + KEY_LENGTH.size + len(encoded)] = encoded
+        position = self.used + size - VALUE.size
+        VALUE.pack_into(self.map, position, 0.0)
+        self.used += size
+        HEADER.pack_into(self.map, 0, self.used)
+        return position
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+def read_values(path):
+    with open(path, 'rb') as source:
+        data = source.read()
+    if len(data) < HEADER.size:
+        return {}
+    used = HEADER.unpack_from(data, 0)[0]
+    return {key: VALUE.unpack_from(data, position)[0]
+            for key, position in read_entries(data, used)}
+
+
+class Registry:
+    """The metrics of this process, written to ``METRICS_DIR/<pid>.db``."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = []
+        self.values = None
+        self.owner = None
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def directory(self):
+        return Path(settings.METRICS_DIR)
+
+    def file(self):
+        # Re-open after a fork or a change of the directory.
+        owner = os.getpid(), self.directory()
+        if self.owner != owner:
+            if self.values is not None:
+                self.values.close()
+            owner[1].mkdir(parents=True, exist_ok=True)
+            self.values = MmapValues(owner[1] / f'{owner[0]}{FILE_SUFFIX}')
+            self.owner = owner
+        return self.values
+
+    def inc(self, increments):
+        with self.lock:
+            values = self.file()
+            for key, amount in increments:
+                values.inc(key, amount)
+
+    def collect(self):
+        """Sum the values of every process: ``{sample key: value}``."""
+        totals = {}
+        directory = self.directory()
+        if not directory.is_dir():
+            return totals
+        for path in sorted(directory.glob('*' + FILE_SUFFIX)):
+            for key, value in read_values(path).items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def exposition(self):
+        """All metrics in the Prometheus text format."""
+        samples = {}
+        for key, value in self.collect().items():
+            samples.setdefault(key.partition('{')[0], []).append(
+                (key, value)
+            )
+        lines = []
+        for metric in self.metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name in metric.sample_names():
+                lines.extend(f'{key} {format_value(value)}'
+                             for key, value in samples.get(name, []))
+        return '\n'.join(lines) + '\n'
+
+
+def format_value(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def escape(value):
+    return (str(value).replace('\\', r'\\').replace('"', r'\"')
+            .replace('\n', r'\n'))
+
+
+def sample_key(name, labels):
+    if not labels:
+        return name
+    return name + '{' + ','.join(
+        f'{label}="{escape(value)}"' for label, value in labels.items()
+    ) + '}'
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, documentation, registry):
+        self.name = name
+        self.documentation = documentation
+        self.registry = registry
+        registry.register(self)
+
+    def sample_names(self):
+        return [self.name]
+
+    def inc(self, amount=1, **labels):
+        self.registry.inc([(sample_key(self.name, labels), amount)])
+
+
+class Histogram:
+    """A histogram with fixed ``buckets``.
+
+    Every bucket is written on each observation, so a new series is
+    stored, and later exposed, in bucket order.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, registry, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.registry = registry
+        registry.register(self)
+        self.buckets = [*(format_value(bound) for bound in buckets), '+Inf']
+        self.bounds = [*buckets, float('inf')]
+
+    def sample_names(self):
+        return [f'{self.name}_bucket', f'{self.name}_sum',
+                f'{self.name}_count']
+
+    def observe(self, value, **labels):
+        self.registry.inc([
+            *((sample_key(f'{self.name}_bucket', {**labels, 'le': bucket}),
+               int(value <= bound))
+              for bucket, bound in zip(self.buckets, self.bounds)),
+            (sample_key(f'{self.name}_sum', labels), value),
+            (sample_key(f'{self.name}_count', labels), 1),
+        ])
+
+
+REGISTRY = Registry()
+
+REQUESTS = Counter(
+    'blogicum_requests_total', 'Обработанные запросы.', REGISTRY
+)
+LATENCY = Histogram(
+    'blogicum_request_duration_seconds', 'Время ответа.', REGISTRY,
+    (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+QUERIES = Histogram(
+    'blogicum_request_queries', 'Запросы к базе данных за запрос.',
+    REGISTRY, (0, 1, 2, 3, 5, 8, 13, 21, 34, 55),
+)
+RESPONSE_SIZE = Histogram(
+    'blogicum_response_size_bytes', 'Размер тела ответа.', REGISTRY,
+    (1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+PAGE_CACHE = Counter(
+    'blogicum_page_cache_total', 'Обращения к кешу страниц.', REGISTRY
+)
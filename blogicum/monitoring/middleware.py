@@ -0,0 +1,169 @@
+import logging
+import random
+import time
+
+from django.conf import settings
+
+from .budgets import QueryBudgetExceeded, budget_problems, view_budget
+from .metrics import LATENCY, PAGE_CACHE, QUERIES, REQUESTS, RESPONSE_SIZE
+from .profiling import sample_stacks, write_profile
+from .queries import record_queries
+from .slow_queries import log_slow_queries
+from .timing import finish_request, timed_request
+
+logger = logging.getLogger(__name__)
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else None
+
+
+class QueryBudgetMiddleware:
+    """Record the SQL work of every request and check it against budgets.
+
+    Put it before ``SessionMiddleware`` and ``AuthenticationMiddleware``,
+    so their queries are counted too, and after ``MetricsMiddleware``,
+    which reads the totals. They are attached to the response as
+    ``query_stats``. A request over its budget from ``QUERY_BUDGETS`` is
+    logged, or fails with :class:`QueryBudgetExceeded` when
+    ``QUERY_BUDGET_ENFORCE`` is on, as it is in the test suite.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with record_queries() as recorder:
+            response = self.get_response(request)
+        name = view_name(request)
+        response.query_stats = {'view': name, **recorder.as_dict()}
+        budget = view_budget(name)
+        problems = budget_problems(recorder, *budget) if budget else []
+        if problems:
+            message = f'{name} {request.path}: ' + '; '.join(problems)
+            if getattr(settings, 'QUERY_BUDGET_ENFORCE', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning('Превышен бюджет запросов: %s', message)
+        return response
+
+
+def is_staff(request):
+    # Only a logged in visitor can be staff; checking for the session
+    # cookie first keeps cached anonymous pages free of queries. The user
+    # is missing when a middleware answered before authentication ran.
+    user = getattr(request, 'user', None)
+    return (settings.SESSION_COOKIE_NAME in request.COOKIES
+            and user is not None and user.is_staff)
+
+
+def shows_server_timing(request):
+    return (getattr(settings, 'SERVER_TIMING_PUBLIC', False)
+            or is_staff(request))
+
+
+class ServerTimingMiddleware:
+    """Break every request down into phases and report them.
+
+    Put it before ``SessionMiddleware`` and ``AuthenticationMiddleware``,
+    whose work it times, and before the other monitoring middleware, so
+    their overhead is part of the total. The phases go to staff, or to
+    everyone with ``SERVER_TIMING_PUBLIC``, in the ``Server-Timing``
+    header, and to the ``monitoring.timing`` logger as one JSON line once
+    the response has been written.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with timed_request() as timer:
+            response = self.get_response(request)
+        timer.finish()
+        if shows_server_timing(request):
+            response['Server-Timing'] = timer.server_timing()
+        finish_request(timer, {
+            'view': view_name(request),
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+        })
+        return response
+
+
+class ProfilingMiddleware:
+    """Sample the call stack of chosen requests into collapsed-stack files.
+
+    A request is profiled when a staff member sends the
+    ``PROFILING_HEADER`` header, or at random with the probability
+    ``PROFILING_SAMPLE_RATE``. The samples are written to
+    ``PROFILING_DIR``, one directory per view, in the format read by
+    flamegraph tools and by the ``aggregate_profiles`` command. A staff
+    request gets the file name back in the ``X-Profile`` header. Put it
+    after ``AuthenticationMiddleware``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        requested = (
+            settings.PROFILING_HEADER in request.headers and is_staff(request)
+        )
+        if not requested and (
+                random.random() >= settings.PROFILING_SAMPLE_RATE):
+            return self.get_response(request)
+        sampler = sample_stacks()
+        try:
+            response = self.get_response(request)
+        finally:
+            stacks = sampler.stop()
+        path = write_profile(stacks, view_name(request))
+        if requested:
+            response['X-Profile'] = path.name
+        return response
+
+
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+
+class MetricsMiddleware:
+    """Count requests and observe their latency, queries and size per view.
+
+    Put it before ``QueryBudgetMiddleware``, whose ``query_stats`` give
+    the number of queries. Requests that match no URL are labelled
+    ``unresolved``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+        view = view_name(request) or 'unresolved'
+        method = request.method if request.method in METHODS else 'other'
+        REQUESTS.inc(view=view, method=method,
+                     status=response.status_code)
+        LATENCY.observe(elapsed, view=view)
+        stats = getattr(response, 'query_stats', None)
+        if stats is not None:
+            QUERIES.observe(stats['queries'], view=view)
+        if not response.streaming:
+            RESPONSE_SIZE.observe(len(response.content), view=view)
+        page_cache = getattr(request, 'page_cache', None)
+        if page_cache is not None:
+            PAGE_CACHE.inc(view=view, result=page_cache)
+        return response
+
+
+class SlowQueryMiddleware:
+    """Log the slow queries of a request together with its view."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with log_slow_queries(lambda: view_name(request)):
+            return self.get_response(request)
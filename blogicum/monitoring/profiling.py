@@ -0,0 +1,115 @@
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+
+PROFILE_SUFFIX = '.folded'
+
+
+def frame_label(frame):
+    return f'{frame.f_globals.get("__name__", "?")}:{frame.f_code.co_name}'
+
+
+def collapse(frame):
+    """The stack of ``frame`` in collapsed form, outermost call first."""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class StackSampler(threading.Thread):
+    """Samples the stack of another thread at a fixed interval.
+
+    The first sample is taken straight away, so even a request shorter
+    than the interval leaves a profile behind.
+    """
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name='stack-sampler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while True:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[collapse(frame)] += 1
+            del frame
+            if self.stopped.wait(self.interval):
+                return
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        return self.stacks
+
+
+def sample_stacks(interval=None):
+    """Start sampling the calling thread; ``stop()`` returns the stacks."""
+    sampler = StackSampler(
+        threading.get_ident(),
+        interval or getattr(settings, 'PROFILING_INTERVAL', 0.005)
+    )
+    sampler.start()
+    return sampler
+
+
+def view_directory(view_name):
+    return (view_name or 'unresolved').replace(':', '.')
+
+
+def dump_stacks(path, stacks):
+    path.write_text(''.join(f'{stack} {total}\n'
+                            for stack, total in stacks.most_common()))
+
+
+def write_profile(stacks, view_name):
+    """Save ``stacks`` under the view's directory and return the path."""
+    directory = Path(settings.PROFILING_DIR) / view_directory(view_name)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / (f'{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}-'
+                        f'{uuid.uuid4().hex[:8]}{PROFILE_SUFFIX}')
+    dump_stacks(path, stacks)
+    return path
+
+
+def read_profile(path):
+    stacks = Counter()
+    with open(path) as source:
+        for line in source:
+            stack, _, total = line.rstrip('\n').rpartition(' ')
+            if stack:
+                stacks[stack] += int(total)
+    return stacks
+
+
+def collect_profiles(directory):
+    """Merge the saved profiles of every view: ``{view: stacks}``."""
+    profiles = {}
+    for view_dir in sorted(Path(directory).iterdir()):
+        if not view_dir.is_dir():
+            continue
+        stacks = Counter()
+        files = sorted(view_dir.glob('*' + PROFILE_SUFFIX))
+        for path in files:
+            stacks.update(read_profile(path))
+        if files:
+            profiles[view_dir.name] = (len(files), stacks)
+    return profiles
+
+
+def hottest(stacks, count):
+    """Functions with the most samples of their own, i.e. on top."""
+    own = Counter()
+    for stack, total in stacks.items():
+        own[stack.rpartition(';')[2]] += total
+    return own.most_common(count)
@@ -0,0 +1,54 @@
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+IN_LIST = re.compile(r'\((?:%s, )+%s\)')
+
+
+def query_shape(sql):
+    """SQL with parameter lists collapsed, so N+1 repeats compare equal."""
+    return IN_LIST.sub('(%s, ...)', sql)
+
+
+class QueryRecorder:
+    """Counts queries, their time and repeated shapes on all connections."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.shapes[query_shape(sql)] += 1
+
+    @property
+    def duplicates(self):
+        """Shapes executed more than once, with their repeat counts."""
+        return {shape: total for shape, total in self.shapes.items()
+                if total > 1}
+
+    def as_dict(self):
+        return {
+            'queries': self.count,
+            'db_ms': round(self.duration * 1000, 2),
+            'duplicates': sum(total - 1
+                              for total in self.duplicates.values()),
+        }
+
+
+@contextmanager
+def record_queries():
+    recorder = QueryRecorder()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        yield recorder
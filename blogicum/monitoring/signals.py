@@ -0,0 +1,20 @@
+import json
+import logging
+
+from django.core.signals import request_finished
+from django.dispatch import receiver
+
+from .timing import pop_finished
+
+logger = logging.getLogger('monitoring.timing')
+
+
+@receiver(request_finished)
+def log_request_timing(sender, **kwargs):
+    finished = pop_finished()
+    if finished is None:
+        return
+    timer, details = finished
+    timer.written()
+    logger.info(json.dumps({**details, **timer.as_dict()},
+                           ensure_ascii=False))
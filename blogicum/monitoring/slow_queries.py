@@ -0,0 +1,143 @@
+import json
+import logging
+import os
+import threading
+import time
+import traceback
+from contextlib import ExitStack, contextmanager
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+_handlers = {}
+_handlers_lock = threading.Lock()
+
+
+def process_log():
+    """``SLOW_QUERY_LOG`` with the pid of this process before the suffix."""
+    path = Path(settings.SLOW_QUERY_LOG)
+    return path.with_name(f'{path.stem}.{os.getpid()}{path.suffix}')
+
+
+def log_handler():
+    """The rotating file handler of this process, made on demand.
+
+    Every worker process writes a file of its own: rotation renames the
+    file, which is not safe while other processes keep it open.
+    """
+    path = process_log()
+    with _handlers_lock:
+        if path not in _handlers:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _handlers[path] = RotatingFileHandler(
+                path, maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+                backupCount=settings.SLOW_QUERY_LOG_BACKUPS, encoding='utf-8'
+            )
+        return _handlers[path]
+
+
+def log_files():
+    """The logs of every process and their rotated copies, oldest first."""
+    path = Path(settings.SLOW_QUERY_LOG)
+    if not path.parent.exists():
+        return []
+    return sorted(path.parent.glob(f'{path.stem}.*{path.suffix}*'),
+                  key=lambda file: file.stat().st_mtime)
+
+
+def read_entries():
+    for path in log_files():
+        with open(path, encoding='utf-8') as source:
+            for line in source:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def project_stack():
+    """The calling frames from the project's own code, innermost last."""
+    root = str(settings.BASE_DIR)
+    own = str(Path(__file__).parent)
+    return [
+        f'{Path(frame.filename).relative_to(root)}:{frame.lineno} '
+        f'in {frame.name}'
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(root)
+        and not frame.filename.startswith(own)
+    ]
+
+
+def explain(connection, sql, params):
+    """The query plan of ``sql``, or ``None`` if it can't be explained.
+
+    The plan is read through a bare backend cursor, which bypasses
+    the execute wrappers, so it is neither logged nor counted again. Its
+    errors therefore come straight from the database driver.
+    """
+    if not sql.lstrip().upper().startswith('SELECT'):
+        return None
+    try:
+        cursor = connection.create_cursor()
+        try:
+            cursor.execute(
+                f'{connection.ops.explain_query_prefix()} {sql}', params
+            )
+            return [str(row[-1]) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+    except connection.Database.Error:
+        return None
+
+
+class SlowQueryLogger:
+    """Write queries slower than ``SLOW_QUERY_THRESHOLD_MS`` to the log.
+
+    ``view`` is called when a slow query is found, so it can name a view
+    that was resolved after the logger was installed.
+    """
+
+    def __init__(self, view=None):
+        self.view = view or (lambda: None)
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = execute(sql, params, many, context)
+            failed = False
+            return result
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            if elapsed >= settings.SLOW_QUERY_THRESHOLD_MS:
+                self.log(context['connection'], sql, params, many, elapsed,
+                         failed)
+
+    def log(self, connection, sql, params, many, elapsed, failed=False):
+        # A failed query may have aborted the transaction (PostgreSQL), so
+        # it is not explained.
+        entry = {
+            'time': timezone.now().isoformat(),
+            'view': self.view(),
+            'duration_ms': round(elapsed, 2),
+            'sql': sql,
+            'params': params,
+            'many': many,
+            'failed': failed,
+            'stack': project_stack(),
+            'plan': (None if many or failed
+                     else explain(connection, sql, params)),
+        }
+        log_handler().handle(logging.makeLogRecord({
+            'msg': json.dumps(entry, ensure_ascii=False, default=str),
+        }))
+
+
+@contextmanager
+def log_slow_queries(view=None):
+    logger = SlowQueryLogger(view)
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(logger))
+        yield logger
@@ -0,0 +1,20 @@
+from contextlib import contextmanager
+
+from .budgets import QueryBudgetExceeded, budget_problems
+from .queries import record_queries
+
+
+@contextmanager
+def query_budget(max_queries, max_duplicates=0):
+    """Fail the block if it runs more queries than allowed.
+
+    Usage in tests::
+
+        with query_budget(5):
+            client.get('/')
+    """
+    with record_queries() as recorder:
+        yield recorder
+    problems = budget_problems(recorder, max_queries, max_duplicates)
+    if problems:
+        raise QueryBudgetExceeded('; '.join(problems))
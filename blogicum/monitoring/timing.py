@@ -0,0 +1,167 @@
+import functools
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from importlib import import_module
+
+from django.conf import settings
+from django.db import connections
+
+_local = threading.local()
+
+
+class RequestTimer:
+    """Splits the wall time of one request into named phases.
+
+    Phases nest: a template rendered inside the view or a query run while
+    a template is rendered is charged to the inner phase only, so the
+    phases add up to the total. Everything not covered by a phase belongs
+    to the root phase, ``middleware``. Template rendering is additionally
+    broken down by template name.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = defaultdict(float)
+        self.templates = defaultdict(float)
+        self.queries = 0
+        self.stack = [0.0]
+
+    @contextmanager
+    def phase(self, name, template=None):
+        self.stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            own = elapsed - self.stack.pop()
+            self.stack[-1] += elapsed
+            self.phases[name] += own
+            if template is not None:
+                self.templates[template] += own
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        with self.phase('db'):
+            return execute(sql, params, many, context)
+
+    def finish(self):
+        """Close the root phase once the response has left the middleware."""
+        self.total = time.perf_counter() - self.started
+        self.phases['middleware'] += self.total - self.stack[0]
+
+    def written(self):
+        """Charge the time since :meth:`finish` to the ``write`` phase."""
+        elapsed = time.perf_counter() - self.started - self.total
+        self.phases['write'] += elapsed
+        self.total += elapsed
+
+    def as_dict(self):
+        return {
+            'total_ms': round(self.total * 1000, 2),
+            'queries': self.queries,
+            'phases': {name: round(value * 1000, 2)
+                       for name, value in self.phases.items()},
+            'templates': {name: round(value * 1000, 2)
+                          for name, value in self.templates.items()},
+        }
+
+    def server_timing(self):
+        """Value of the ``Server-Timing`` header."""
+        metrics = []
+        for name, value in self.phases.items():
+            metric = f'{name};dur={value * 1000:.2f}'
+            if name == 'db':
+                metric += f';desc="{self.queries} queries"'
+            metrics.append(metric)
+        metrics.extend(
+            f'tpl;dur={value * 1000:.2f};desc="{name}"'
+            for name, value in self.templates.items()
+        )
+        metrics.append(f'total;dur={self.total * 1000:.2f}')
+        return ', '.join(metrics)
+
+
+def finish_request(timer, details):
+    """Keep ``timer`` until the response is written, see ``signals``."""
+    _local.finished = timer, details
+
+
+def pop_finished():
+    finished = getattr(_local, 'finished', None)
+    _local.finished = None
+    return finished
+
+
+def current_timer():
+    return getattr(_local, 'timer', None)
+
+
+@contextmanager
+def timed_request():
+    """Time the block, and the queries it runs, as one request."""
+    timer = _local.timer = RequestTimer()
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            yield timer
+    finally:
+        _local.timer = None
+
+
+def timed(phase, template=None):
+    """Decorate a function so its calls count towards ``phase``.
+
+    ``template`` may be a callable taking the same arguments and returning
+    the template name to charge instead.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            timer = current_timer()
+            if timer is None:
+                return func(*args, **kwargs)
+            name = template(*args, **kwargs) if template else None
+            with timer.phase(phase, name):
+                return func(*args, **kwargs)
+        wrapper.timed = True
+        return wrapper
+    return decorator
+
+
+def instrument(owner, attribute, phase, template=None):
+    func = getattr(owner, attribute)
+    if not getattr(func, 'timed', False):
+        setattr(owner, attribute, timed(phase, template)(func))
+
+
+def template_name(template, *args, **kwargs):
+    return template.origin.template_name or template.name or '<string>'
+
+
+def timed_views(make_view_atomic):
+    @functools.wraps(make_view_atomic)
+    def wrapper(self, view):
+        return timed('view')(make_view_atomic(self, view))
+    wrapper.timed = True
+    return wrapper
+
+
+def install():
+    """Wrap the parts of Django that make up the phases of a request."""
+    from django.contrib.auth import middleware as auth_middleware
+    from django.core.handlers.base import BaseHandler
+    from django.template.base import Template
+
+    instrument(BaseHandler, 'resolve_request', 'resolve')
+    if not getattr(BaseHandler.make_view_atomic, 'timed', False):
+        BaseHandler.make_view_atomic = timed_views(
+            BaseHandler.make_view_atomic
+        )
+    instrument(import_module(settings.SESSION_ENGINE).SessionStore, 'load',
+               'session')
+    instrument(auth_middleware, 'get_user', 'auth')
+    instrument(Template, 'render', 'render', template_name)
@@ -0,0 +1,13 @@
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+
+from .metrics import REGISTRY
+
+
+def metrics(request):
+    """The metrics of all worker processes for Prometheus; staff only."""
+    if not request.user.is_staff:
+        raise PermissionDenied
+    return HttpResponse(REGISTRY.exposition(),
+                        content_type='text/plain; version=0.0.4; '
+                        'charset=utf-8')
@@ -19,6 +19,7 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -41,6 +42,39 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def enforce_query_budgets(settings):
+    settings.QUERY_BUDGET_ENFORCE = True
+
+
+@pytest.fixture(autouse=True)
+def isolated_monitoring(settings, tmp_path):
+    settings.METRICS_DIR = tmp_path / "metrics"
+    settings.SLOW_QUERY_LOG = tmp_path / "logs" / "slow_queries.log"
+
+
+@pytest.fixture(autouse=True, scope="session")
+def local_cache():
+    # Keep the tests away from the developer's file-based cache.
+    with override_settings(CACHES={
+        alias: {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": alias,
+        }
+        for alias in ("default", "tags")
+    }):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    for alias in ("default", "tags"):
+        caches[alias].clear()
+    yield
+    for alias in ("default", "tags"):
+        caches[alias].clear()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -363,6 +397,7 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
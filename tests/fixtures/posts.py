@@ -140,3 +140,31 @@ def create_post_context_form_item(
         ),
     )
     return result
+
+
+@pytest.fixture
+def make_public_posts(mixer: Mixer, user, published_category):
+    def make(count, author=None, **fields):
+        return mixer.cycle(count).blend("blog.Post", **{
+            "author": author or user,
+            "category": published_category,
+            "is_published": True,
+            "pub_date": timezone.now() - timedelta(days=1),
+            **fields,
+        })
+    return make
+
+
+@pytest.fixture
+def public_posts(make_public_posts, published_location):
+    return make_public_posts(5, location=published_location)
+
+
+@pytest.fixture
+def posts_with_shared_pub_dates(make_public_posts):
+    base = timezone.now() - timedelta(days=1)
+    n_posts = N_PER_PAGE * 2 + 5
+    return make_public_posts(
+        n_posts, pub_date=(base - timedelta(hours=i // 3)
+                           for i in range(n_posts))
+    )
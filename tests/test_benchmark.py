@@ -0,0 +1,45 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+
+from blog.cache import COUNT_KEY, TAG_KEY
+from blog.models import Comment, Post
+from blog.management.commands.benchmark import SCENARIOS
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_benchmark_reports_every_scenario(post_with_published_location,
+                                          tmp_path):
+    posts, comments = Post.objects.count(), Comment.objects.count()
+    report_path = tmp_path / 'bench.json'
+    call_command('benchmark', requests=3, warmup=1, json=str(report_path),
+                 stdout=StringIO())
+    report = json.loads(report_path.read_text())
+    assert set(report['scenarios']) == set(SCENARIOS)
+    for name, result in report['scenarios'].items():
+        assert result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+    assert report['scenarios']['index']['queries'] > 0
+    assert report['scenarios']['index']['bytes'] > 0
+    assert (Post.objects.count(), Comment.objects.count()) == (
+        posts, comments
+    ), "Убедитесь, что бенчмарк откатывает созданные им записи."
+
+    out = StringIO()
+    call_command('benchmark', 'index', requests=2, warmup=1,
+                 compare=str(report_path), stdout=out)
+    assert 'запросы +0' in out.getvalue()
+
+
+def test_benchmark_leaves_cache_alone(post_with_published_location):
+    cache.set(COUNT_KEY.format('index'), 1)
+    cache.set(TAG_KEY.format('index'), 1.0, timeout=None)
+    call_command('benchmark', 'post_create', 'comment_create', requests=3,
+                 warmup=0, stdout=StringIO())
+    assert cache.get(COUNT_KEY.format('index')) == 1
+    assert cache.get(TAG_KEY.format('index')) == 1.0, (
+        "Убедитесь, что бенчмарк не сбрасывает кеш работающего сайта."
+    )
@@ -0,0 +1,61 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+CHANGELIST = '/admin/blog/comment/'
+
+
+@pytest.fixture
+def comments(mixer, user, another_user, post_with_published_location):
+    post = post_with_published_location
+    return [
+        mixer.blend('blog.Comment', post=post, author=user,
+                    text='Отличная фотография!'),
+        mixer.blend('blog.Comment', post=post, author=user,
+                    text='Спасибо за рассказ.'),
+        mixer.blend('blog.Comment', post=post, author=another_user,
+                    text='Фотография так себе.'),
+    ]
+
+
+def test_comment_search_uses_index(admin_client, comments):
+    response = admin_client.get(CHANGELIST, {'q': 'ФОТОГРАФ'})
+    assert set(response.context['cl'].result_list) == {
+        comments[0], comments[2]
+    }, "Убедитесь, что поиск по комментариям в админке работает."
+    comment = comments[1]
+    comment.text = 'Хорошая фотография.'
+    comment.save()
+    response = admin_client.get(CHANGELIST, {'q': 'фотограф'})
+    assert comment in response.context['cl'].result_list, (
+        "Убедитесь, что индекс комментариев обновляется при изменении."
+    )
+
+
+def test_comment_facets(admin_client, comments, user):
+    response = admin_client.get(CHANGELIST)
+    choices = {
+        spec.title: [choice['display'] for choice in spec.choices(
+            response.context['cl']
+        )][1:]
+        for spec in response.context['cl'].filter_specs
+    }
+    assert choices['автор'][0] == f'{user.username} (2)', (
+        "Убедитесь, что в фильтре по авторам показаны самые активные "
+        "комментаторы с числом комментариев."
+    )
+    assert len(choices['публикация']) == 1
+    response = admin_client.get(CHANGELIST, {'author': user.pk})
+    assert set(response.context['cl'].result_list) == set(comments[:2])
+
+
+def test_comment_facets_are_cached(admin_client, comments, mixer, user):
+    admin_client.get(CHANGELIST)
+    mixer.blend('blog.Comment', post=comments[0].post, author=user)
+    response = admin_client.get(CHANGELIST)
+    authors = next(spec for spec in response.context['cl'].filter_specs
+                   if spec.title == 'автор')
+    assert authors.lookup_choices[0][1] == f'{user.username} (2)', (
+        "Убедитесь, что фильтры по авторам и публикациям берутся из кеша, "
+        "а не пересчитываются при каждом открытии списка."
+    )
@@ -0,0 +1,103 @@
+import time
+from datetime import timedelta
+from http import HTTPStatus
+from types import SimpleNamespace
+
+import pytest
+from django.conf import settings
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog import cache as blog_cache
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _urls(post):
+    return (
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+        f"/posts/{post.id}/",
+    )
+
+
+def test_unchanged_pages_return_not_modified(
+        django_assert_num_queries, unlogged_client,
+        post_with_published_location
+):
+    for url in _urls(post_with_published_location):
+        response = unlogged_client.get(url)
+        assert response.has_header("ETag"), (
+            f"Убедитесь, что страница `{url}` отдаёт заголовок ETag."
+        )
+        assert response.has_header("Last-Modified")
+        with django_assert_num_queries(0):
+            not_modified = unlogged_client.get(
+                url, HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+        assert not_modified.status_code == HTTPStatus.NOT_MODIFIED, (
+            f"Убедитесь, что неизменившаяся страница `{url}` отвечает 304"
+            " без обращения к базе данных."
+        )
+
+
+def test_changes_refresh_validators(
+        mixer: Mixer, unlogged_client, post_with_published_location
+):
+    post = post_with_published_location
+    responses = {url: unlogged_client.get(url) for url in _urls(post)}
+    mixer.blend("blog.Comment", post=post)
+    for url, response in responses.items():
+        fresh = unlogged_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        assert fresh.status_code == HTTPStatus.OK, (
+            f"Убедитесь, что после нового комментария страница `{url}`"
+            " отдаётся заново."
+        )
+
+
+def test_validators_depend_on_viewer(
+        user_client, another_user_client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    etag = user_client.get(url)["ETag"]
+    response = another_user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что ETag страницы зависит от пользователя."
+    )
+
+
+def test_validators_follow_csrf_cookie(
+        user_client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    etag = user_client.get(url)["ETag"]
+    # Logging in again rotates the token the comment form carries.
+    user_client.cookies[settings.CSRF_COOKIE_NAME] = "rotated"
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что ETag страницы меняется вместе с CSRF-токеном."
+    )
+
+
+def test_scheduled_publication_refreshes_last_modified(
+        monkeypatch, mixer: Mixer, unlogged_client,
+        post_with_published_location
+):
+    mixer.blend(
+        "blog.Post",
+        is_published=True,
+        category=post_with_published_location.category,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+    last_modified = unlogged_client.get("/")["Last-Modified"]
+
+    later, now = time.time() + 10, timezone.now()
+    monkeypatch.setattr(blog_cache, "time",
+                        SimpleNamespace(time=lambda: later))
+    monkeypatch.setattr(timezone, "now", lambda: now + timedelta(hours=2))
+    response = unlogged_client.get("/", HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что Last-Modified меняется, когда наступает дата"
+        " отложенной публикации."
+    )
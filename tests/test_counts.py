@@ -0,0 +1,101 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog import paginators
+from blog.cache import COUNT_KEY
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+INDEX_COUNT_KEY = COUNT_KEY.format("index")
+
+
+def test_feed_count_is_cached(user_client, public_posts):
+    user_client.get("/")
+    assert cache.get(INDEX_COUNT_KEY) == len(public_posts)
+    cache.set(INDEX_COUNT_KEY, 1000)
+    response = user_client.get("/")
+    assert response.context["paginator"].count == 1000, (
+        "Убедитесь, что количество публикаций в ленте берётся из кеша."
+    )
+
+
+def feed_count(client):
+    return client.get("/").context["paginator"].count
+
+
+def test_feed_count_follows_writes(
+        mixer: Mixer, user_client, public_posts, published_category
+):
+    user_client.get("/")
+    new_post = mixer.blend(
+        "blog.Post",
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(hours=1),
+    )
+    assert cache.get(INDEX_COUNT_KEY) is None, (
+        "Убедитесь, что создание публикации сбрасывает закешированное"
+        " количество публикаций ленты."
+    )
+    assert feed_count(user_client) == len(public_posts) + 1
+    mixer.blend("blog.Comment", post=new_post)
+    assert cache.get(INDEX_COUNT_KEY) == len(public_posts) + 1, (
+        "Убедитесь, что комментарий не сбрасывает количество публикаций."
+    )
+    new_post.is_published = False
+    new_post.save()
+    assert feed_count(user_client) == len(public_posts)
+    public_posts[0].delete()
+    assert feed_count(user_client) == len(public_posts) - 1, (
+        "Убедитесь, что после удаления публикации количество публикаций"
+        " ленты пересчитывается."
+    )
+    published_category.is_published = False
+    published_category.save()
+    assert feed_count(user_client) == 0
+
+
+def test_large_counts_are_estimated(monkeypatch, public_posts):
+    monkeypatch.setattr(paginators, "COUNT_ESTIMATE_THRESHOLD", 1)
+    count = paginators.estimated_count(Post.objects.all())
+    assert count >= len(public_posts), (
+        "Убедитесь, что для больших выборок количество оценивается сверху."
+    )
+
+
+def test_table_estimate_covers_unpublished_posts(mixer: Mixer,
+                                                 public_posts):
+    mixer.cycle(6).blend("blog.Post", is_published=False)
+    total = Post.objects.count()
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+        # Put the partial index, which covers published posts only, first.
+        cursor.execute("DELETE FROM sqlite_stat1 WHERE tbl = 'blog_post'")
+        cursor.execute(
+            "INSERT INTO sqlite_stat1 VALUES "
+            "('blog_post', 'post_public_feed_idx', %s), "
+            "('blog_post', 'post_pub_date_idx', %s)",
+            [f"{len(public_posts)} 1", f"{total} 1"]
+        )
+    assert paginators.table_row_estimate(Post) >= total, (
+        "Убедитесь, что оценка размера таблицы не берётся из статистики"
+        " частичного индекса."
+    )
+
+
+def test_filtered_counts_are_exact(monkeypatch, public_posts, mixer: Mixer):
+    mixer.cycle(4).blend("blog.Post")
+    monkeypatch.setattr(paginators, "COUNT_ESTIMATE_THRESHOLD", 1)
+    count = paginators.estimated_count(
+        Post.objects.filter(pk__in=[post.pk for post in public_posts])
+    )
+    assert count == len(public_posts), (
+        "Убедитесь, что количество отфильтрованной выборки не оценивается "
+        "по размеру всей таблицы."
+    )
@@ -0,0 +1,73 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count, F
+from django.utils import timezone
+
+from blog.cache import next_scheduled_publication
+from blog.models import Category, Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_generate_data():
+    call_command(
+        'generate_data', users=10, categories=4, locations=3, posts=300,
+        comments=2000, unpublished=0.2, scheduled=0.2, batch=128, seed=1,
+        stdout=StringIO()
+    )
+    assert Post.objects.count() == 300
+    assert Comment.objects.count() == 2000
+    assert Category.objects.count() == 4
+    assert Post.objects.filter(is_published=False).exists()
+    assert Post.objects.filter(pub_date__gt=timezone.now()).exists(), (
+        "Убедитесь, что генератор создаёт отложенные публикации."
+    )
+    per_post = sorted(
+        Post.objects.annotate(total=Count('comments')).values_list(
+            'total', flat=True
+        ), reverse=True
+    )
+    assert per_post[0] > 10 * per_post[len(per_post) // 2], (
+        "Убедитесь, что комментарии распределены по публикациям "
+        "неравномерно."
+    )
+    for post in Post.objects.annotate(total=Count('comments')):
+        assert post.comment_count == post.total, (
+            "Убедитесь, что после генерации счётчики комментариев "
+            "пересчитываются."
+        )
+    assert Post.objects.values('created_at').distinct().count() > 250, (
+        "Убедитесь, что у публикаций разные даты создания."
+    )
+    assert not Post.objects.filter(created_at__gt=timezone.now()).exists()
+    assert not Comment.objects.filter(
+        created_at__lt=F('post__pub_date')
+    ).exists(), (
+        "Убедитесь, что комментарии не старше своих публикаций."
+    )
+    assert Comment.objects.values('created_at').distinct().count() > 1900
+
+
+def test_generate_data_refreshes_cached_pages(
+        unlogged_client, user_client, post_with_published_location
+):
+    unlogged_client.get("/")
+    etag = user_client.get("/")["ETag"]
+    call_command(
+        'generate_data', users=3, categories=2, locations=1, posts=50,
+        comments=20, scheduled=0.5, seed=1, stdout=StringIO()
+    )
+    assert unlogged_client.get("/").context is not None, (
+        "Убедитесь, что после генерации данных лента не отдаётся из кеша."
+    )
+    response = user_client.get("/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что после генерации данных меняется ETag ленты."
+    )
+    assert next_scheduled_publication() is not None, (
+        "Убедитесь, что после генерации данных учитываются новые"
+        " отложенные публикации."
+    )
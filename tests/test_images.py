@@ -0,0 +1,175 @@
+from datetime import timedelta
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from django.utils import timezone
+from bs4 import BeautifulSoup
+from PIL import Image
+
+from blog.constants import (IMAGE_DERIVATIVES, IMAGE_FORMATS,
+                            IMAGE_JOB_TIMEOUT, IMAGE_PLACEHOLDER)
+from blog.images import derivative_name, derivative_names
+from blog.models import ImageStatus, Post
+from blog.tasks import claim_image_job, run_image_job
+
+pytestmark = [pytest.mark.django_db]
+
+EXIF_ORIENTATION = 0x0112
+ROTATED_270 = 6
+
+
+def process_images():
+    call_command('process_images', '--once', stdout=StringIO())
+
+
+@pytest.fixture
+def rotated_post(mixer, user, published_location, published_category):
+    img = Image.new('RGB', (120, 60), color=(73, 109, 137))
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION] = ROTATED_270
+    img_io = BytesIO()
+    img.save(img_io, format='JPEG', exif=exif)
+    return mixer.blend(
+        'blog.Post', location=published_location,
+        category=published_category, author=user,
+        image=ImageFile(img_io, name='rotated.jpg')
+    )
+
+
+def test_upload_is_queued(user_client, post_with_published_location):
+    post = post_with_published_location
+    assert post.image_status == ImageStatus.PENDING, (
+        "Убедитесь, что загруженное изображение ставится в очередь "
+        "на обработку."
+    )
+    feed = user_client.get("/").content.decode()
+    assert IMAGE_PLACEHOLDER in feed, (
+        "Убедитесь, что пока изображение обрабатывается, в ленте "
+        "показывается заглушка."
+    )
+
+
+def test_derivatives_created_by_worker(post_with_published_location):
+    process_images()
+    post_with_published_location.refresh_from_db()
+    assert post_with_published_location.image_status == ImageStatus.READY
+    image = post_with_published_location.image
+    for name in derivative_names(image.name, image.width):
+        assert image.storage.exists(name), (
+            "Убедитесь, что после обработки изображения создаётся копия"
+            f" `{name}`."
+        )
+    admin_name = derivative_name(image.name, "admin")
+    with image.storage.open(admin_name) as derivative:
+        assert Image.open(derivative).size == IMAGE_DERIVATIVES["admin"]
+
+
+def test_responsive_widths(mixer, user, published_category):
+    img_io = BytesIO()
+    Image.new('RGB', (1000, 500)).save(img_io, format='JPEG')
+    post = mixer.blend('blog.Post', author=user, category=published_category,
+                       image=ImageFile(img_io, name='wide.jpg'))
+    process_images()
+    post.refresh_from_db()
+    assert post.image_widths == [320, 640, 960, 1000]
+    for width in post.image_widths:
+        for ext in IMAGE_FORMATS:
+            name = derivative_name(post.image.name, f'{width}w', ext)
+            with post.image.storage.open(name) as derivative:
+                assert Image.open(derivative).size == (width, width // 2), (
+                    "Убедитесь, что для каждой ширины создаются копии "
+                    "во всех форматах."
+                )
+
+
+def test_worker_strips_metadata(rotated_post):
+    process_images()
+    rotated_post.refresh_from_db()
+    with rotated_post.image.open() as processed:
+        image = Image.open(processed)
+        assert image.size == (60, 120), (
+            "Убедитесь, что при обработке учитывается ориентация из EXIF."
+        )
+        assert EXIF_ORIENTATION not in image.getexif(), (
+            "Убедитесь, что при обработке удаляются метаданные EXIF."
+        )
+
+
+def test_feed_serves_picture(user_client, post_with_published_location):
+    process_images()
+    post = post_with_published_location
+    post.refresh_from_db()
+    feed = BeautifulSoup(user_client.get("/").content.decode(), "html.parser")
+    picture = feed.find("picture")
+    assert picture, (
+        "Убедитесь, что изображение в ленте выводится в теге `<picture>`."
+    )
+    source = picture.find("source", type="image/webp")
+    assert source and source["srcset"] == post.image_srcset("webp"), (
+        "Убедитесь, что в `<picture>` есть вариант в формате WebP."
+    )
+    img = picture.find("img")
+    assert img["srcset"] == post.image_srcset("jpg")
+    assert img["loading"] == "lazy"
+    assert (img["width"], img["height"]) == ("100", "100"), (
+        "Убедитесь, что у изображения указаны ширина и высота."
+    )
+    assert f'src="{post.image.url}"' not in str(feed)
+
+
+def test_unprocessed_stored_image(user_client, post_with_published_location):
+    process_images()
+    post = post_with_published_location
+    # What loaddata or a data migration leaves behind: a stored file
+    # marked as ready, but never measured or resized.
+    Post.objects.filter(pk=post.pk).update(image_width=None,
+                                           image_aspect=None)
+    response = user_client.get("/")
+    assert response.status_code == 200
+    assert IMAGE_PLACEHOLDER in response.content.decode(), (
+        "Убедитесь, что необработанное изображение не ломает ленту."
+    )
+    post.refresh_from_db()
+    post.save()
+    assert post.image_status == ImageStatus.PENDING, (
+        "Убедитесь, что необработанное изображение ставится в очередь."
+    )
+    process_images()
+    post.refresh_from_db()
+    assert post.image_ready
+
+
+def test_edit_during_processing_requeues(post_with_published_location):
+    post = post_with_published_location
+    assert claim_image_job(post.pk)
+    # The edit form loads the post while the worker is running ...
+    stale = Post.objects.get(pk=post.pk)
+    assert run_image_job(Post.objects.get(pk=post.pk))
+    # ... and saves it after the worker has finished.
+    stale.save()
+    stale.refresh_from_db()
+    assert stale.image_status == ImageStatus.PENDING, (
+        "Убедитесь, что сохранение поста, загруженного во время обработки"
+        " изображения, возвращает изображение в очередь."
+    )
+    process_images()
+    stale.refresh_from_db()
+    assert stale.image_ready
+
+
+def test_stale_jobs_are_requeued(post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(
+        image_status=ImageStatus.PROCESSING,
+        image_claimed_at=timezone.now() - timedelta(
+            seconds=IMAGE_JOB_TIMEOUT + 1
+        ),
+    )
+    process_images()
+    post.refresh_from_db()
+    assert post.image_ready, (
+        "Убедитесь, что зависшие задачи обработки изображений"
+        " возвращаются в очередь."
+    )
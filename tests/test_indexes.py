@@ -0,0 +1,55 @@
+import pytest
+
+from blog.models import Comment, Post
+from blog.views import anotate_order_for_post, filter_post_for_public
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _assert_uses_index(queryset, index_name, page_name):
+    plan = queryset[:10].explain()
+    assert index_name in plan, (
+        f"Убедитесь, что запрос {page_name} использует индекс"
+        f" `{index_name}`. План запроса:\n{plan}"
+    )
+    assert "TEMP B-TREE" not in plan, (
+        f"Убедитесь, что запрос {page_name} не сортируется во временном"
+        f" B-дереве. План запроса:\n{plan}"
+    )
+
+
+def test_public_feed_uses_index(post_with_published_location):
+    queryset = anotate_order_for_post(filter_post_for_public(Post.objects))
+    _assert_uses_index(queryset, "post_public_feed_idx", "главной страницы")
+
+
+def test_category_feed_uses_index(post_with_published_location):
+    queryset = anotate_order_for_post(filter_post_for_public(
+        Post.objects.filter(category=post_with_published_location.category)
+    ))
+    _assert_uses_index(
+        queryset, "post_category_feed_idx", "страницы категории"
+    )
+
+
+def test_author_feed_uses_index(post_with_published_location):
+    queryset = anotate_order_for_post(
+        post_with_published_location.author.posts.all()
+    )
+    _assert_uses_index(
+        queryset, "post_author_feed_idx", "страницы пользователя"
+    )
+    _assert_uses_index(
+        filter_post_for_public(queryset),
+        "post_author_feed_idx",
+        "страницы пользователя для посетителей",
+    )
+
+
+def test_post_comments_use_index(post_with_published_location):
+    queryset = Comment.objects.filter(
+        post=post_with_published_location
+    ).order_by("created_at")
+    _assert_uses_index(
+        queryset, "comment_post_created_idx", "комментариев публикации"
+    )
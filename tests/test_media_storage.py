@@ -0,0 +1,104 @@
+import os
+import re
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.images import derivative_names
+
+pytestmark = [pytest.mark.django_db]
+
+ADDRESSED = re.compile(
+    r'^post_images/([0-9a-f]{2})/([0-9a-f]{2})/\1\2[0-9a-f]{60}\.jpg$'
+)
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def photo(color=(73, 109, 137), name='photo.jpg'):
+    img_io = BytesIO()
+    Image.new('RGB', (100, 80), color=color).save(img_io, format='JPEG')
+    return ImageFile(img_io, name=name)
+
+
+def make_post(mixer, user, image):
+    return mixer.blend('blog.Post', author=user, image=image)
+
+
+def run(command, *args):
+    call_command(command, *args, stdout=StringIO())
+
+
+def test_uploads_are_content_addressed(mixer, user):
+    first = make_post(mixer, user, photo(name='a.jpg'))
+    second = make_post(mixer, user, photo(name='b.JPG'))
+    assert ADDRESSED.match(first.image.name), (
+        "Убедитесь, что загруженный файл сохраняется под именем из "
+        "хеша содержимого во вложенных каталогах."
+    )
+    assert first.image.name == second.image.name, (
+        "Убедитесь, что одинаковые загрузки хранятся в одном файле."
+    )
+    run('process_images', '--once')
+    first.refresh_from_db()
+    second.refresh_from_db()
+    assert first.image.name == second.image.name
+    assert ADDRESSED.match(first.image.name)
+
+
+def test_gc_keeps_referenced_files(mixer, user):
+    kept = make_post(mixer, user, photo())
+    replaced = make_post(mixer, user, photo(color=(200, 0, 0)))
+    deleted = make_post(mixer, user, photo(color=(0, 200, 0)))
+    run('process_images', '--once')
+    for post in (kept, replaced, deleted):
+        post.refresh_from_db()
+    storage = kept.image.storage
+    orphans = [replaced.image.name, deleted.image.name] + derivative_names(
+        deleted.image.name, deleted.image_width
+    )
+    replaced.image = photo(color=(0, 0, 200))
+    replaced.save()
+    deleted.delete()
+    run('gc_media', '--grace', '0')
+    for name in [kept.image.name] + derivative_names(kept.image.name,
+                                                     kept.image_width):
+        assert storage.exists(name), (
+            "Убедитесь, что `gc_media` не удаляет файлы, которые "
+            "используются в публикациях."
+        )
+    assert storage.exists(replaced.image.name)
+    for name in orphans:
+        assert not storage.exists(name), (
+            "Убедитесь, что `gc_media` удаляет файлы, на которые не "
+            "ссылается ни одна публикация."
+        )
+
+
+def test_gc_respects_grace_period(mixer, user):
+    post = make_post(mixer, user, photo())
+    name = post.image.name
+    post.delete()
+    run('gc_media')
+    assert post.image.storage.exists(name), (
+        "Убедитесь, что `gc_media` не удаляет только что загруженные файлы."
+    )
+
+
+def test_dedup_hit_refreshes_file(mixer, user):
+    first = make_post(mixer, user, photo())
+    path = first.image.path
+    os.utime(path, (0, 0))
+    second = make_post(mixer, user, photo())
+    assert second.image.name == first.image.name
+    assert os.path.getmtime(path) > 0, (
+        "Убедитесь, что повторно использованный файл не выглядит старым"
+        " для `gc_media`."
+    )
@@ -0,0 +1,100 @@
+import threading
+
+import pytest
+from django.urls import reverse
+
+from monitoring.metrics import REGISTRY, REQUESTS, MmapValues
+
+pytestmark = [pytest.mark.django_db]
+
+METRICS_URL = reverse("monitoring:metrics")
+
+
+def samples(admin_client):
+    response = admin_client.get(METRICS_URL)
+    return dict(
+        line.rsplit(" ", 1)
+        for line in response.content.decode().splitlines()
+        if not line.startswith("#")
+    )
+
+
+def test_metrics_are_staff_only(client, user_client, admin_client):
+    assert client.get(METRICS_URL).status_code == 403
+    assert user_client.get(METRICS_URL).status_code == 403, (
+        "Убедитесь, что метрики доступны только сотрудникам."
+    )
+    response = admin_client.get(METRICS_URL)
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+
+
+def test_requests_recorded_per_view(client, admin_client,
+                                    post_with_published_location):
+    client.get("/")
+    client.get("/")
+    result = samples(admin_client)
+    assert result[
+        'blogicum_requests_total{view="blog:index",method="GET",'
+        'status="200"}'
+    ] == "2", (
+        "Убедитесь, что число запросов считается по имени представления."
+    )
+    assert result[
+        'blogicum_request_duration_seconds_count{view="blog:index"}'
+    ] == "2"
+    assert result[
+        'blogicum_request_duration_seconds_bucket{view="blog:index",'
+        'le="+Inf"}'
+    ] == "2"
+    assert 'blogicum_request_queries_bucket{view="blog:index",le="0"}' in (
+        result
+    )
+    assert float(result[
+        'blogicum_response_size_bytes_sum{view="blog:index"}'
+    ]) > 0
+    assert result[
+        'blogicum_page_cache_total{view="blog:index",result="miss"}'
+    ] == "1"
+    assert result[
+        'blogicum_page_cache_total{view="blog:index",result="hit"}'
+    ] == "1", "Убедитесь, что попадания в кеш страниц учитываются."
+
+
+def test_processes_are_summed(settings, admin_client):
+    REQUESTS.inc(view="blog:index", method="GET", status=200)
+    other = MmapValues(settings.METRICS_DIR / "1.db")
+    other.inc(
+        'blogicum_requests_total{view="blog:index",method="GET",'
+        'status="200"}', 2
+    )
+    other.close()
+    assert samples(admin_client)[
+        'blogicum_requests_total{view="blog:index",method="GET",'
+        'status="200"}'
+    ] == "3", (
+        "Убедитесь, что метрики всех рабочих процессов суммируются."
+    )
+
+
+def test_registry_is_thread_safe(settings):
+    def work():
+        for _ in range(500):
+            REQUESTS.inc(view="threads")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert REGISTRY.collect()['blogicum_requests_total{view="threads"}'] == (
+        4000
+    )
+
+
+def test_file_grows(settings):
+    for number in range(3000):
+        REQUESTS.inc(view=f"view-{number}")
+    totals = REGISTRY.collect()
+    assert len(totals) == 3000
+    assert totals['blogicum_requests_total{view="view-2999"}'] == 1
@@ -0,0 +1,75 @@
+import pytest
+from django.contrib.admin import helpers
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.cache import batched_invalidation, bump_tags, tag_versions
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def spam(make_public_posts, user, another_user):
+    return (make_public_posts(30, user, title='Спам'),
+            make_public_posts(2, another_user, title='Спам'))
+
+
+def run_action(admin_client, model, action, pks):
+    return admin_client.post(f'/admin/blog/{model}/', {
+        'action': action,
+        helpers.ACTION_CHECKBOX_NAME: pks,
+    })
+
+
+def test_invalidation_is_sent_once():
+    versions = tag_versions(['index'])
+    with batched_invalidation():
+        bump_tags(['index'])
+        assert tag_versions(['index']) == versions, (
+            "Убедитесь, что внутри пакетной операции кеш сбрасывается "
+            "только после её завершения."
+        )
+    assert tag_versions(['index']) != versions
+
+
+def test_unpublish_is_batched(admin_client, unlogged_client, spam):
+    posts, _ = spam
+    assert 'Спам' in unlogged_client.get('/').content.decode()
+    with CaptureQueriesContext(connection) as queries:
+        run_action(admin_client, 'post', 'unpublish',
+                   [post.pk for post in posts])
+    updates = [query for query in queries
+               if query['sql'].startswith('UPDATE "blog_post"')]
+    assert len(updates) == 1, (
+        "Убедитесь, что снятие с публикации выполняется одним UPDATE "
+        "на пачку записей."
+    )
+    assert not Post.objects.filter(
+        pk__in=[post.pk for post in posts], is_published=True
+    ).exists()
+    assert Post.objects.filter(is_published=True).count() == 2
+    feed = unlogged_client.get('/')
+    assert feed.context is not None, (
+        "Убедитесь, что после массовых действий кеш ленты сбрасывается."
+    )
+
+
+def test_delete_everything_by_authors(admin_client, spam, mixer, user,
+                                      another_user):
+    posts, others = spam
+    mixer.blend('blog.Comment', post=others[0], author=user, text='Купи!')
+    kept = mixer.blend('blog.Comment', post=others[0], author=another_user)
+    response = run_action(admin_client, 'post',
+                          'delete_everything_by_authors', [posts[0].pk])
+    assert response.status_code == 302
+    assert not Post.objects.filter(author=user).exists()
+    assert list(Comment.objects.all()) == [kept]
+    others[0].refresh_from_db()
+    assert others[0].comment_count == 1, (
+        "Убедитесь, что после массового удаления комментариев счётчики "
+        "комментариев пересчитываются."
+    )
+    assert not admin_client.get(
+        '/admin/blog/comment/', {'q': 'Купи'}
+    ).context['cl'].result_list
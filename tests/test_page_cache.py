@@ -0,0 +1,177 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog import signals
+from blog.cache import tag_versions
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_anonymous_pages_are_cached(
+        unlogged_client, post_with_published_location
+):
+    post = post_with_published_location
+    urls = (
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+        f"/posts/{post.id}/",
+    )
+    for url in urls:
+        first = unlogged_client.get(url)
+        second = unlogged_client.get(url)
+        assert first.status_code == second.status_code == HTTPStatus.OK
+        assert second.context is None, (
+            f"Убедитесь, что страница `{url}` для анонимных посетителей"
+            " отдаётся из кеша."
+        )
+        assert second.content == first.content
+
+
+def test_authenticated_pages_are_not_cached(
+        user_client, post_with_published_location
+):
+    user_client.get("/")
+    assert user_client.get("/").context is not None, (
+        "Убедитесь, что страницы авторизованных пользователей не кешируются."
+    )
+
+
+def test_new_post_invalidates_feed(
+        mixer: Mixer, unlogged_client, post_with_published_location
+):
+    unlogged_client.get("/")
+    new_post = mixer.blend(
+        "blog.Post",
+        title="Свежая публикация",
+        is_published=True,
+        pub_date=timezone.now() - timedelta(minutes=1),
+        category=post_with_published_location.category,
+    )
+    content = unlogged_client.get("/").content.decode("utf-8")
+    assert new_post.title in content, (
+        "Убедитесь, что новая публикация сразу появляется в закешированной"
+        " ленте."
+    )
+
+
+def test_unpublished_category_is_purged(
+        unlogged_client, post_with_published_location
+):
+    post = post_with_published_location
+    category = post.category
+    category_url = f"/category/{category.slug}/"
+    post_url = f"/posts/{post.id}/"
+    assert unlogged_client.get(category_url).status_code == HTTPStatus.OK
+    assert unlogged_client.get(post_url).status_code == HTTPStatus.OK
+
+    category.is_published = False
+    category.save()
+
+    assert unlogged_client.get(category_url).status_code == (
+        HTTPStatus.NOT_FOUND
+    ), (
+        "Убедитесь, что снятие категории с публикации сразу сбрасывает кеш"
+        " страницы категории."
+    )
+    assert unlogged_client.get(post_url).status_code == (
+        HTTPStatus.NOT_FOUND
+    ), (
+        "Убедитесь, что снятие категории с публикации сразу сбрасывает кеш"
+        " страниц её публикаций."
+    )
+
+
+def test_new_comment_invalidates_post_page(
+        mixer: Mixer, unlogged_client, post_with_published_location
+):
+    post = post_with_published_location
+    unlogged_client.get(f"/posts/{post.id}/")
+    comment = mixer.blend("blog.Comment", post=post, text="Новый комментарий")
+    content = unlogged_client.get(f"/posts/{post.id}/").content.decode()
+    assert comment.text in content, (
+        "Убедитесь, что новый комментарий сразу появляется на закешированной"
+        " странице публикации."
+    )
+
+
+def test_category_write_does_not_visit_its_posts(
+        mixer: Mixer, monkeypatch, unlogged_client,
+        post_with_published_location
+):
+    category = post_with_published_location.category
+    mixer.cycle(20).blend(
+        "blog.Post", category=category, location=None,
+        author=post_with_published_location.author,
+    )
+    bumped = []
+    monkeypatch.setattr(
+        signals, "bump_tags", lambda tags: bumped.append(set(tags))
+    )
+    category.title = "Новое название"
+    category.save()
+    assert len(bumped) == 1 and len(bumped[0]) <= 3, (
+        "Убедитесь, что изменение категории сбрасывает несколько тегов,"
+        " а не по тегу на каждую её публикацию."
+    )
+
+
+def test_tags_are_bumped_again_on_commit(
+        django_capture_on_commit_callbacks, post_with_published_location
+):
+    post = post_with_published_location
+    tag = f"post:{post.pk}"
+    with django_capture_on_commit_callbacks(execute=True):
+        post.title = "Исправленный заголовок"
+        post.save()
+        # A concurrent request may cache the old row under this version.
+        seen = tag_versions([tag])[tag]
+    assert tag_versions([tag])[tag] != seen, (
+        "Убедитесь, что теги сбрасываются повторно после фиксации"
+        " транзакции."
+    )
+
+
+def test_login_keeps_profile_cached(client, user):
+    tag = f"author:{user.username}"
+    seen = tag_versions([tag])[tag]
+    client.force_login(user)
+    assert tag_versions([tag])[tag] == seen, (
+        "Убедитесь, что вход пользователя не сбрасывает кеш его страниц."
+    )
+
+
+def test_renamed_commenter_invalidates_post_page(
+        mixer: Mixer, unlogged_client, another_user,
+        post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    mixer.blend("blog.Comment", post=post_with_published_location,
+                author=another_user)
+    unlogged_client.get(url)
+    another_user.username = "renamed_commenter"
+    another_user.save()
+    content = unlogged_client.get(url).content.decode("utf-8")
+    assert "renamed_commenter" in content, (
+        "Убедитесь, что после переименования комментатора страница поста"
+        " с его комментарием отдаётся заново."
+    )
+
+
+def test_unknown_query_parameters_share_cached_page(
+        unlogged_client, many_posts_with_published_locations
+):
+    unlogged_client.get("/?utm=1")
+    response = unlogged_client.get("/?utm=2")
+    assert response.context is None, (
+        "Убедитесь, что посторонние параметры запроса не создают новых"
+        " записей в кеше страниц."
+    )
+    assert "utm" not in response.content.decode("utf-8")
+    assert unlogged_client.get("/?page=2").context is not None, (
+        "Убедитесь, что страницы ленты кешируются по отдельности."
+    )
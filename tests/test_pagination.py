@@ -0,0 +1,67 @@
+import pytest
+from django.core.paginator import Paginator
+from django.http import Http404
+from django.template import Context, Template
+from django.test import RequestFactory
+
+from blog.views import IndexListView
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _cursor_page(user, query=None):
+    view = IndexListView.as_view(cursor_pagination=True)
+    request = RequestFactory().get("/", query or {})
+    request.user = user
+    response = view(request)
+    return response.context_data["page_obj"]
+
+
+def test_cursor_pagination_walks_feed(user, posts_with_shared_pub_dates):
+    expected = sorted(
+        posts_with_shared_pub_dates,
+        key=lambda post: (post.pub_date, post.pk),
+        reverse=True,
+    )
+    seen = []
+    page = _cursor_page(user)
+    assert not page.has_previous()
+    pages = [page]
+    while page.has_next():
+        seen.extend(page)
+        page = _cursor_page(user, {"after": page.next_cursor})
+        pages.append(page)
+    seen.extend(page)
+    assert [post.pk for post in seen] == [post.pk for post in expected], (
+        "Убедитесь, что курсорная пагинация выдаёт публикации «от новых к"
+        " старым» без пропусков и повторов."
+    )
+
+    previous = _cursor_page(user, {"before": pages[-1].previous_cursor})
+    expected_previous = [post.pk for post in pages[-2]]
+    assert [post.pk for post in previous] == expected_previous, (
+        "Убедитесь, что ссылка «назад» курсорной пагинации возвращает"
+        " предыдущую страницу."
+    )
+
+
+def test_cursor_pagination_rejects_bad_token(
+        user, posts_with_shared_pub_dates
+):
+    with pytest.raises(Http404):
+        _cursor_page(user, {"after": "not-a-cursor"})
+
+
+def test_paginator_window_does_not_grow_with_page_count():
+    template = Template('{% include "includes/paginator.html" %}')
+    sizes = []
+    for n_items in (N_PER_PAGE * 50, N_PER_PAGE * 5000):
+        page_obj = Paginator(range(n_items), N_PER_PAGE).page(25)
+        html = template.render(Context({"page_obj": page_obj}))
+        assert 'href="?page=24"' in html and 'href="?page=26"' in html
+        sizes.append(html.count("page-item"))
+    assert sizes[0] == sizes[1], (
+        "Убедитесь, что число ссылок пагинатора не зависит от общего"
+        " количества страниц."
+    )
@@ -0,0 +1,56 @@
+import pytest
+from bs4 import BeautifulSoup
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.constants import IMAGE_PLACEHOLDER
+
+pytestmark = [pytest.mark.django_db]
+
+
+def changelist_queries(admin_client):
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get('/admin/blog/post/')
+    assert response.status_code == 200
+    return len(queries)
+
+
+def test_changelist_queries_do_not_grow(
+        admin_client, mixer, user, published_category, published_location):
+    def add_posts(count):
+        mixer.cycle(count).blend(
+            'blog.Post', author=user, category=published_category,
+            location=published_location
+        )
+    add_posts(2)
+    few = changelist_queries(admin_client)
+    add_posts(20)
+    assert changelist_queries(admin_client) == few, (
+        "Убедитесь, что список публикаций в админке загружает автора, "
+        "категорию и местоположение одним запросом."
+    )
+
+
+def test_change_form_uses_autocomplete(admin_client, mixer, user,
+                                       published_category):
+    mixer.cycle(5).blend('blog.Location')
+    post = mixer.blend('blog.Post', author=user, category=published_category)
+    content = admin_client.get(
+        f'/admin/blog/post/{post.pk}/change/'
+    ).content.decode()
+    for field in ('author', 'location', 'category'):
+        assert f'id="id_{field}" class="admin-autocomplete' in content, (
+            f"Убедитесь, что поле `{field}` в админке выбирается через "
+            "автодополнение."
+        )
+
+
+def test_queued_image_thumbnail(admin_client, post_with_published_location):
+    content = admin_client.get('/admin/blog/post/').content.decode()
+    images = BeautifulSoup(content, 'html.parser').find_all(
+        'img', width='80'
+    )
+    assert [img['src'] for img in images] == [IMAGE_PLACEHOLDER], (
+        'Убедитесь, что пока изображение обрабатывается, в списке '
+        'публикаций показывается заглушка.'
+    )
@@ -0,0 +1,51 @@
+import pytest
+from django.template import Context, Template
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+CARDS_TEMPLATE = Template(
+    "{% load blog_tags %}{% post_cards posts as cards %}"
+    "{% for card in cards %}{{ card }}{% endfor %}"
+)
+
+
+def _render_cards():
+    posts = Post.objects.select_related("author", "category", "location")
+    return CARDS_TEMPLATE.render(Context({"posts": posts}))
+
+
+def test_cards_are_served_from_cache(
+        django_assert_num_queries, post_with_published_location
+):
+    _render_cards()
+    with django_assert_num_queries(1):
+        html = _render_cards()
+    assert post_with_published_location.title in html
+
+
+def test_card_follows_related_changes(post_with_published_location):
+    post = post_with_published_location
+    _render_cards()
+
+    post.category.title = "Новое название категории"
+    post.category.save()
+    assert post.category.title in _render_cards(), (
+        "Убедитесь, что изменение категории сбрасывает кеш карточек её"
+        " публикаций."
+    )
+
+    post.location.name = "Новое место"
+    post.location.save()
+    assert post.location.name in _render_cards(), (
+        "Убедитесь, что изменение местоположения сбрасывает кеш карточек"
+        " публикаций."
+    )
+
+    post.author.username = "renamed_author"
+    post.author.save()
+    assert "@renamed_author" in _render_cards(), (
+        "Убедитесь, что смена имени автора сбрасывает кеш карточек его"
+        " публикаций."
+    )
@@ -0,0 +1,75 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from monitoring.profiling import read_profile, sample_stacks
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def profiles(settings, tmp_path):
+    settings.PROFILING_DIR = tmp_path / "profiles"
+    settings.PROFILING_INTERVAL = 0.001
+    return settings.PROFILING_DIR
+
+
+def busy_loop():
+    return sum(i * i for i in range(200000))
+
+
+def test_sampler_sees_hot_function():
+    sampler = sample_stacks(0.001)
+    for _ in range(5):
+        busy_loop()
+    stacks = sampler.stop()
+    assert any("test_profiling:busy_loop" in stack for stack in stacks), (
+        "Убедитесь, что профилировщик собирает стеки вызовов потока."
+    )
+
+
+def test_staff_header_writes_profile(profiles, admin_client, client):
+    response = admin_client.get("/", HTTP_X_PROFILE="1")
+    files = list((profiles / "blog.index").iterdir())
+    assert [path.name for path in files] == [response["X-Profile"]], (
+        "Убедитесь, что по заголовку от сотрудника запрос профилируется, "
+        "а сэмплы сохраняются в каталог представления."
+    )
+    assert sum(read_profile(files[0]).values()) > 0
+
+    response = client.get("/", HTTP_X_PROFILE="1")
+    assert not response.has_header("X-Profile"), (
+        "Убедитесь, что посетители не могут включить профилирование."
+    )
+    assert len(list((profiles / "blog.index").iterdir())) == 1
+
+
+def test_sample_rate(profiles, settings, client):
+    client.get("/")
+    assert not profiles.exists()
+    settings.PROFILING_SAMPLE_RATE = 1
+    client.get("/")
+    client.get("/")
+    assert len(list((profiles / "blog.index").iterdir())) == 2, (
+        "Убедитесь, что доля профилируемых запросов задаётся настройкой."
+    )
+
+
+def test_aggregate_profiles(profiles, settings, client, tmp_path_factory):
+    settings.PROFILING_SAMPLE_RATE = 1
+    for _ in range(3):
+        client.get("/")
+    client.get("/auth/login/")
+    output = tmp_path_factory.mktemp("flamegraphs")
+    stdout = StringIO()
+    call_command("aggregate_profiles", "blog:index", output=output,
+                 stdout=stdout)
+    report = stdout.getvalue()
+    assert "blog.index: запросов 3" in report, (
+        "Убедитесь, что команда aggregate_profiles объединяет сэмплы "
+        "по представлениям."
+    )
+    assert "login" not in report
+    merged = read_profile(output / "blog.index.folded")
+    assert sum(merged.values()) >= 3
@@ -0,0 +1,80 @@
+import pytest
+from django.urls import reverse
+from mixer.backend.django import Mixer
+
+from blog.models import Post
+from monitoring.budgets import QueryBudgetExceeded
+from monitoring.testing import query_budget
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_pages_within_budget(user_client, user, public_posts,
+                             published_category):
+    post = public_posts[0]
+    urls = [
+        reverse("blog:index"),
+        reverse("blog:category_posts", args=[published_category.slug]),
+        reverse("blog:post_detail", args=[post.pk]),
+        reverse("blog:profile", args=[user.username]),
+        reverse("blog:search") + "?q=" + post.title[:5],
+        reverse("blog:edit_post", args=[post.pk]),
+    ]
+    for url in urls:
+        response = user_client.get(url)
+        assert response.status_code == 200
+        assert response.query_stats["duplicates"] == 0, (
+            f"Убедитесь, что страница `{url}` не выполняет одинаковых "
+            "запросов к базе данных."
+        )
+
+
+def test_response_carries_query_stats(user_client, public_posts):
+    response = user_client.get(reverse("blog:index"))
+    stats = response.query_stats
+    assert stats["view"] == "blog:index"
+    assert 0 < stats["queries"] <= 5, (
+        "Убедитесь, что к ответу прикладывается число выполненных "
+        "запросов к базе данных."
+    )
+    assert stats["db_ms"] >= 0
+
+
+def test_budget_is_enforced(settings, user_client, public_posts):
+    settings.QUERY_BUDGETS = {"blog:index": 1}
+    with pytest.raises(QueryBudgetExceeded, match="blog:index"):
+        user_client.get(reverse("blog:index"))
+
+
+def test_budget_only_logged_when_not_enforced(settings, user_client,
+                                              public_posts, caplog):
+    settings.QUERY_BUDGETS = {"blog:index": 1}
+    settings.QUERY_BUDGET_ENFORCE = False
+    response = user_client.get(reverse("blog:index"))
+    assert response.status_code == 200
+    assert "blog:index" in caplog.text, (
+        "Убедитесь, что превышение бюджета запросов записывается в журнал."
+    )
+
+
+def test_duplicate_queries_detected(public_posts):
+    with pytest.raises(QueryBudgetExceeded, match="повторных"):
+        with query_budget(10):
+            for post in public_posts:
+                Post.objects.filter(pk=post.pk).exists()
+    with query_budget(1) as recorder:
+        list(Post.objects.filter(pk__in=[post.pk for post in public_posts]))
+    assert recorder.count == 1
+
+
+def test_deleting_discussed_post_within_budget(mixer: Mixer, user_client,
+                                               public_posts):
+    post = public_posts[0]
+    mixer.cycle(50).blend("blog.Comment", post=post)
+    response = user_client.post(reverse("blog:delete_post", args=[post.pk]))
+    assert response.status_code == 302
+    assert not Post.objects.filter(pk=post.pk).exists()
+    assert response.query_stats["queries"] <= 12, (
+        "Убедитесь, что удаление публикации не выполняет запросов на каждый"
+        " её комментарий."
+    )
@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.cache import next_scheduled_publication, page_timeout, tag_cache
+from blog.models import Post
+from blog.scheduler import WATERMARK_KEY, publish_due_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def scheduled_post(mixer: Mixer, published_category):
+    return mixer.blend(
+        "blog.Post",
+        title="Отложенная публикация",
+        is_published=True,
+        category=published_category,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+
+
+def test_next_publication_caps_page_timeout(scheduled_post):
+    assert next_scheduled_publication() == scheduled_post.pub_date, (
+        "Убедитесь, что планировщик сообщает время ближайшей отложенной"
+        " публикации."
+    )
+    assert page_timeout(60 * 60 * 24) <= 60 * 60, (
+        "Убедитесь, что кеш страниц истекает не позже ближайшей отложенной"
+        " публикации."
+    )
+
+
+def test_due_post_invalidates_feed(unlogged_client, scheduled_post):
+    feed = unlogged_client.get("/").content.decode()
+    assert scheduled_post.title not in feed
+    tag_cache.set(WATERMARK_KEY, timezone.now() - timedelta(minutes=1))
+    Post.objects.filter(pk=scheduled_post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1)
+    )
+    assert publish_due_posts() == 1, (
+        "Убедитесь, что планировщик находит наступившие публикации."
+    )
+    feed = unlogged_client.get("/").content.decode()
+    assert scheduled_post.title in feed, (
+        "Убедитесь, что при наступлении даты публикации кеш ленты"
+        " сбрасывается."
+    )
+
+
+def test_watermark_survives_page_cache_clear(scheduled_post):
+    publish_due_posts()
+    cache.clear()
+    Post.objects.filter(pk=scheduled_post.pk).update(
+        pub_date=timezone.now() - timedelta(hours=1)
+    )
+    assert publish_due_posts() == 0, (
+        "Убедитесь, что отметка последнего запуска планировщика не"
+        " теряется при очистке кеша страниц."
+    )
+
+
+def test_due_posts_are_invalidated_in_one_batch(
+        mixer: Mixer, django_assert_num_queries, published_category
+):
+    tag_cache.set(WATERMARK_KEY, timezone.now() - timedelta(minutes=1))
+    mixer.cycle(5).blend(
+        "blog.Post",
+        is_published=True,
+        category=published_category,
+        pub_date=timezone.now() - timedelta(seconds=1),
+    )
+    with django_assert_num_queries(2):
+        assert publish_due_posts() == 5
@@ -0,0 +1,99 @@
+import pytest
+from bs4 import BeautifulSoup
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    def make(title, text, **kwargs):
+        kwargs.setdefault('is_published', True)
+        kwargs.setdefault('pub_date',
+                          timezone.now() - timezone.timedelta(days=1))
+        return mixer.blend('blog.Post', title=title, text=text, author=user,
+                           category=published_category, **kwargs)
+    return {
+        'title': make('Прогулка по Москве', 'Рассказ о городе.'),
+        'text': make('Заметки', 'Вчера гуляли по Москве до ночи.'),
+        'other': make('Рецепт', 'Борщ со сметаной.'),
+        'hidden': make('Москва ночью', 'Скрытый пост.', is_published=False),
+        'scheduled': make(
+            'Москва завтра', 'Отложенный пост.',
+            pub_date=timezone.now() + timezone.timedelta(days=1)
+        ),
+    }
+
+
+def result_ids(client, query):
+    response = client.get('/search/', {'q': query})
+    assert response.status_code == 200
+    return response, [
+        int(a['href'].strip('/').split('/')[-1])
+        for a in BeautifulSoup(response.content, 'html.parser').select(
+            'article h5 a'
+        )
+    ]
+
+
+def test_search_ranks_public_posts(client, posts):
+    _, ids = result_ids(client, 'москв')
+    assert ids == [posts['title'].id, posts['text'].id], (
+        "Убедитесь, что поиск находит только опубликованные посты, "
+        "а совпадения в заголовке стоят выше совпадений в тексте."
+    )
+
+
+
+def test_search_counts_without_ranking(client, posts):
+    with CaptureQueriesContext(connection) as queries:
+        client.get('/search/', {'q': 'москв'})
+    counts = [query['sql'] for query in queries
+              if 'COUNT(' in query['sql'] and 'blog_post_fts' in query['sql']]
+    assert counts and not any('bm25' in sql or 'snippet' in sql
+                              for sql in counts), (
+        "Убедитесь, что число результатов поиска считается без ранга"
+        " и фрагментов текста."
+    )
+
+def test_search_follows_edits(client, posts):
+    post = posts['other']
+    post.text = 'Борщ по-московски.'
+    post.save()
+    _, ids = result_ids(client, 'МОСКОВ')
+    assert ids == [post.id], (
+        "Убедитесь, что поисковый индекс обновляется при изменении поста."
+    )
+    post.delete()
+    _, ids = result_ids(client, 'москов')
+    assert ids == []
+
+
+def test_snippet_is_escaped(client, mixer, user, published_category):
+    mixer.blend('blog.Post', title='Разметка', author=user,
+                text='<script>alert(1)</script> опасный текст',
+                category=published_category, is_published=True,
+                pub_date=timezone.now() - timezone.timedelta(days=1))
+    response, ids = result_ids(client, 'опасн')
+    content = response.content.decode()
+    assert len(ids) == 1
+    assert '<script>' not in content, (
+        "Убедитесь, что текст в результатах поиска экранируется."
+    )
+    assert '<mark>опасн</mark>' in content, (
+        "Убедитесь, что совпадения в результатах поиска выделены."
+    )
+
+
+def test_query_syntax_is_not_interpreted(client, posts):
+    for query in ('по', '"москв', 'москв OR NOT*', 'NEAR(москв'):
+        result_ids(client, query)
+
+
+def test_admin_search_uses_index(admin_client, posts):
+    response = admin_client.get('/admin/blog/post/', {'q': 'москв'})
+    assert set(response.context['cl'].result_list) == {
+        posts['title'], posts['text'], posts['hidden'], posts['scheduled']
+    }
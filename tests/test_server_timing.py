@@ -0,0 +1,60 @@
+import json
+import logging
+
+import pytest
+from django.urls import reverse
+
+pytestmark = [pytest.mark.django_db]
+
+
+def timing_header(response):
+    return {
+        metric.split(";")[0]: metric
+        for metric in response["Server-Timing"].split(", ")
+        if not metric.startswith("tpl;")
+    }
+
+
+def test_staff_sees_server_timing(admin_client, post_with_published_location):
+    url = reverse("blog:post_detail", args=[post_with_published_location.pk])
+    response = admin_client.get(url)
+    assert response.has_header("Server-Timing"), (
+        "Убедитесь, что сотрудникам отдаётся заголовок `Server-Timing`."
+    )
+    metrics = timing_header(response)
+    for phase in ("resolve", "session", "auth", "db", "view", "render",
+                  "middleware", "total"):
+        assert phase in metrics, (
+            f"Убедитесь, что в `Server-Timing` есть этап `{phase}`."
+        )
+    assert 'desc="blog/detail.html"' in response["Server-Timing"], (
+        "Убедитесь, что время отрисовки указано для каждого шаблона."
+    )
+
+
+def test_server_timing_hidden_from_visitors(
+        settings, client, user_client, post_with_published_location
+):
+    assert not client.get("/").has_header("Server-Timing")
+    assert not user_client.get("/").has_header("Server-Timing"), (
+        "Убедитесь, что заголовок `Server-Timing` по умолчанию видят "
+        "только сотрудники."
+    )
+    settings.SERVER_TIMING_PUBLIC = True
+    assert client.get("/").has_header("Server-Timing")
+
+
+def test_timing_is_logged(caplog, user_client, post_with_published_location):
+    with caplog.at_level(logging.INFO, logger="monitoring.timing"):
+        user_client.get("/")
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record["view"] == "blog:index"
+    assert record["status"] == 200
+    assert record["queries"] > 0
+    assert "write" in record["phases"]
+    assert "blog/index.html" in record["templates"], (
+        "Убедитесь, что время запроса записывается в журнал в формате JSON."
+    )
+    assert sum(record["phases"].values()) == pytest.approx(
+        record["total_ms"], abs=0.1
+    ), "Убедитесь, что этапы запроса в сумме дают его полное время."
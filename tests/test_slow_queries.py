@@ -0,0 +1,83 @@
+import os
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import OperationalError, connection
+
+from monitoring.slow_queries import (explain, log_files, log_slow_queries,
+                                     read_entries)
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def log_everything(settings):
+    settings.SLOW_QUERY_THRESHOLD_MS = 0
+
+
+def test_fast_queries_not_logged(user_client, post_with_published_location):
+    user_client.get("/")
+    assert not list(read_entries())
+
+
+def test_slow_query_logged(log_everything, user_client,
+                           post_with_published_location):
+    user_client.get("/")
+    entries = [entry for entry in read_entries()
+               if entry["view"] == "blog:index"]
+    feed = next(
+        (entry for entry in entries if 'FROM "blog_post"' in entry["sql"]
+         and "LIMIT" in entry["sql"]), None
+    )
+    assert feed is not None, (
+        "Убедитесь, что медленные запросы записываются в журнал вместе с "
+        "именем представления."
+    )
+    assert feed["duration_ms"] >= 0
+    assert isinstance(feed["params"], list)
+    assert any(frame.startswith("blog/") for frame in feed["stack"]), (
+        "Убедитесь, что в журнал попадает стек вызовов из кода проекта."
+    )
+    assert any("blog_post" in line for line in feed["plan"] or []), (
+        "Убедитесь, что для медленного запроса сохраняется его план."
+    )
+
+
+def test_slow_query_report(log_everything, client,
+                           post_with_published_location):
+    client.get("/")
+    client.get("/posts/create/")
+    stdout = StringIO()
+    call_command("slow_query_report", view="blog:index", stdout=stdout)
+    report = stdout.getvalue()
+    assert "blog:index" in report, (
+        "Убедитесь, что команда slow_query_report группирует запросы и "
+        "показывает представления."
+    )
+    assert "blog:create_post" not in report
+
+
+def test_explain_errors_are_swallowed():
+    assert explain(connection, "SELECT * FROM no_such_table", []) is None
+
+
+def test_failed_query_keeps_its_error(log_everything):
+    with pytest.raises(OperationalError, match="no_such_table"):
+        with log_slow_queries(), connection.cursor() as cursor:
+            cursor.execute("SELECT * FROM no_such_table")
+    entry, = read_entries()
+    assert entry["failed"] and entry["plan"] is None, (
+        "Убедитесь, что для упавшего запроса план не запрашивается."
+    )
+
+
+def test_each_process_writes_own_log(log_everything):
+    with log_slow_queries(), connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    assert [path.name for path in log_files()] == [
+        f"slow_queries.{os.getpid()}.log"
+    ], (
+        "Убедитесь, что каждый процесс пишет журнал медленных запросов"
+        " в отдельный файл."
+    )